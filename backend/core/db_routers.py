@@ -0,0 +1,165 @@
+"""
+Read replica routing.
+
+Reads go to the primary unless code opts in with use_replica(). The replica is
+only used while it is configured, reachable and lagging less than
+REPLICA["MAX_LAG_SECONDS"], and never for a client that wrote recently
+(see ReadYourWritesMiddleware).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+_lag_lock = threading.Lock()
+_lag_checks = {}
+
+
+def get_replica_alias() -> Optional[str]:
+    """Return the configured replica alias, or None if no replica is configured."""
+    alias = settings.REPLICA.get("ALIAS")
+    return alias if alias in settings.DATABASES else None
+
+
+def get_replica_lag(alias: str) -> Optional[float]:
+    """
+    Measure the replication lag of a replica in seconds.
+
+    Returns:
+        The lag, 0 for a database that is not a standby, or None if the replica
+        cannot be queried
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor != "postgresql":
+                return 0.0
+            cursor.execute("""
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(
+                        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+                    )
+                END
+                """)
+            return float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        logger.warning("Replica %s is unavailable: %s", alias, e)
+        return None
+
+
+def is_replica_usable(alias: str) -> bool:
+    """
+    Check whether a replica is reachable and within the lag threshold.
+
+    The result is cached per process for REPLICA["LAG_CHECK_INTERVAL"] seconds so
+    the lag query does not run on every request.
+    """
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag_checks.get(alias)
+        if checked and now - checked[0] < settings.REPLICA["LAG_CHECK_INTERVAL"]:
+            return checked[1]
+
+    lag = get_replica_lag(alias)
+    usable = lag is not None and lag <= settings.REPLICA["MAX_LAG_SECONDS"]
+    with _lag_lock:
+        _lag_checks[alias] = (now, usable)
+    return usable
+
+
+@contextmanager
+def use_replica() -> Iterator[str]:
+    """
+    Route reads inside the block to the replica when it is safe to do so.
+
+    Yields:
+        The alias reads are routed to, the primary's when the replica is not used
+    """
+    alias = get_replica_alias()
+    if alias is None or _pinned_to_primary.get() or not is_replica_usable(alias):
+        alias = DEFAULT_DB_ALIAS
+
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def use_primary() -> Iterator[str]:
+    """Route reads inside the block to the primary, overriding use_replica()."""
+    token = _read_alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield DEFAULT_DB_ALIAS
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def pin_to_primary() -> Iterator[None]:
+    """Make use_replica() fall back to the primary inside the block."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class ReplicaRouter:
+    """Sends reads to the alias chosen by use_replica() and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client on the primary for a short time after it writes.
+
+    A successful unsafe request sets a cookie for REPLICA["PIN_SECONDS"]. While
+    the cookie is present, use_replica() reads from the primary, so the client
+    sees its own writes even when the replica is behind.
+    """
+
+    UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = settings.REPLICA["PIN_COOKIE"]
+        if cookie in request.COOKIES:
+            with pin_to_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if request.method in self.UNSAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                cookie,
+                "1",
+                max_age=settings.REPLICA["PIN_SECONDS"],
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
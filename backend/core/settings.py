@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -57,6 +58,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_routers.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -97,6 +99,33 @@ DATABASES = {
     }
 }
 
+# Optional read replica for the survey list and report data.
+# Set DB_REPLICA_HOST (and DB_REPLICA_NAME etc. if they differ from the primary)
+# to enable it. A second local database works for testing the routing.
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# Reads fall back to the primary when the replica lags more than MAX_LAG_SECONDS
+# (checked every LAG_CHECK_INTERVAL seconds) and for PIN_SECONDS after a client's
+# own write.
+REPLICA = {
+    'ALIAS': 'replica',
+    'MAX_LAG_SECONDS': float(os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', '5')),
+    'LAG_CHECK_INTERVAL': float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', '2')),
+    'PIN_SECONDS': int(os.environ.get('DB_REPLICA_PIN_SECONDS', '10')),
+    'PIN_COOKIE': 'db_primary_pin',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -148,3 +177,134 @@ CHANNEL_LAYERS = {
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Generated PDF reports are cached in memory and on disk, keyed by the survey's
+# latest response, so unchanged surveys are served without re-rendering.
+REPORT_CACHE = {
+    'DIR': os.environ.get(
+        'REPORT_CACHE_DIR', str(BASE_DIR.parent / 'survey_reports' / 'cache')
+    ),
+    'MEMORY_MAX_BYTES': int(os.environ.get('REPORT_CACHE_MEMORY_MB', '64')) * 1024 * 1024,
+    'DISK_MAX_BYTES': int(os.environ.get('REPORT_CACHE_DISK_MB', '1024')) * 1024 * 1024,
+}
+
+# Reports are rendered into a spooled temporary file that moves to disk once it
+# grows past this size, bounding per-request memory.
+REPORT_SPOOL_MAX_BYTES = int(os.environ.get('REPORT_SPOOL_MAX_MB', '8')) * 1024 * 1024
+
+# Report jobs run on a bounded local worker pool so web workers stay free.
+# Finished job files are removed after TTL_SECONDS. Queued or running jobs
+# without a heartbeat for STALE_SECONDS (e.g. after a worker restart) are
+# marked failed so the report can be requested again. The process owning a job
+# refreshes its heartbeat every HEARTBEAT_SECONDS while it is queued or running.
+REPORT_JOBS = {
+    'WORKERS': int(os.environ.get('REPORT_JOB_WORKERS', '2')),
+    'DIR': os.environ.get(
+        'REPORT_JOBS_DIR', str(BASE_DIR.parent / 'survey_reports' / 'jobs')
+    ),
+    'TTL_SECONDS': int(os.environ.get('REPORT_JOB_TTL_SECONDS', '3600')),
+    'STALE_SECONDS': int(os.environ.get('REPORT_JOB_STALE_SECONDS', '900')),
+    'HEARTBEAT_SECONDS': int(os.environ.get('REPORT_JOB_HEARTBEAT_SECONDS', '60')),
+}
+
+# Number of warm render processes used to draw report charts in parallel.
+# 0 renders charts sequentially inside the request or job worker.
+REPORT_CHART_WORKERS = int(os.environ.get('REPORT_CHART_WORKERS', '0'))
+
+# Rendered chart images, keyed by a hash of the chart data. Unchanged questions
+# reuse their chart across reports. Set CHART_CACHE_DIR to add a disk tier.
+CHART_CACHE = {
+    'MEMORY_MAX_BYTES': int(os.environ.get('CHART_CACHE_MEMORY_MB', '32')) * 1024 * 1024,
+    'DIR': os.environ.get('CHART_CACHE_DIR') or None,
+    'DISK_MAX_BYTES': int(os.environ.get('CHART_CACHE_DISK_MB', '256')) * 1024 * 1024,
+}
+
+# Batch submissions are validated against a question map loaded once per batch
+# and written CHUNK_SIZE responses per transaction.
+SUBMISSION_BATCH = {
+    'CHUNK_SIZE': int(os.environ.get('SUBMISSION_BATCH_CHUNK_SIZE', '500')),
+    'MAX_ITEMS': int(os.environ.get('SUBMISSION_BATCH_MAX_ITEMS', '10000')),
+}
+
+# Live response counts are spread over this many counter rows per survey, so
+# concurrent submissions do not queue on one row lock. The compact_response_counters
+# command folds them into Survey.response_count.
+RESPONSE_COUNTER_SHARDS = int(os.environ.get('RESPONSE_COUNTER_SHARDS', '16'))
+
+# Shared cache for compiled survey schemas. The default local-memory cache is
+# per process; point CACHE_BACKEND/CACHE_LOCATION at a shared backend when
+# running several web workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+SURVEY_SCHEMA_CACHE_TIMEOUT = int(os.environ.get('SURVEY_SCHEMA_CACHE_TIMEOUT', '3600'))
+
+# The survey list returns only the first characters of each description.
+SURVEY_LIST_DESCRIPTION_LENGTH = int(os.environ.get('SURVEY_LIST_DESCRIPTION_LENGTH', '300'))
+
+# Blocking work of the survey WebSocket consumer (OpenAI calls, saves) runs on
+# one shared pool of WORKERS threads. Up to MAX_QUEUE calls wait for a worker and
+# are told their queue position every POSITION_INTERVAL seconds; further calls
+# are rejected as busy.
+CONSUMER_EXECUTOR = {
+    'WORKERS': int(os.environ.get('CONSUMER_EXECUTOR_WORKERS', '8')),
+    'MAX_QUEUE': int(os.environ.get('CONSUMER_EXECUTOR_MAX_QUEUE', '100')),
+    'POSITION_INTERVAL': float(os.environ.get('CONSUMER_EXECUTOR_POSITION_INTERVAL', '1')),
+}
+
+# Streamed generation chunks are batched into one WebSocket frame per WINDOW_MS
+# (or MAX_BYTES of content, whichever comes first); 0 sends every chunk on its
+# own. Each connection queues at most MAX_QUEUE frames before generation waits
+# for the client to catch up.
+WEBSOCKET_SEND = {
+    'WINDOW_MS': int(os.environ.get('WEBSOCKET_SEND_WINDOW_MS', '30')),
+    'MAX_BYTES': int(os.environ.get('WEBSOCKET_SEND_MAX_BYTES', '4096')),
+    'MAX_QUEUE': int(os.environ.get('WEBSOCKET_SEND_MAX_QUEUE', '64')),
+}
+
+# Generated surveys are cached by normalized prompt, template, question count,
+# language and model, so repeated requests skip the OpenAI call. 'memory' keeps
+# up to MAX_ENTRIES per process (least recently used are evicted), 'db' shares
+# them between workers through a database cache table (run createcachetable;
+# Django culls entries in key order once MAX_ENTRIES is exceeded), 'off'
+# disables the cache. Entries expire TTL_SECONDS after they were generated.
+GENERATION_CACHE_BACKEND = os.environ.get('GENERATION_CACHE_BACKEND', 'memory')
+# 'django' is accepted as an alias of 'db'
+GENERATION_CACHE_BACKENDS = {'memory': 'memory', 'db': 'django', 'django': 'django', 'off': 'off'}
+if GENERATION_CACHE_BACKEND not in GENERATION_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"GENERATION_CACHE_BACKEND must be one of "
+        f"{', '.join(GENERATION_CACHE_BACKENDS)}, got {GENERATION_CACHE_BACKEND!r}"
+    )
+GENERATION_CACHE = {
+    'BACKEND': GENERATION_CACHE_BACKENDS[GENERATION_CACHE_BACKEND],
+    'CACHE_ALIAS': 'generation',
+    'TTL_SECONDS': int(os.environ.get('GENERATION_CACHE_TTL_SECONDS', str(24 * 3600))),
+    'MAX_ENTRIES': int(os.environ.get('GENERATION_CACHE_MAX_ENTRIES', '1000')),
+}
+
+if GENERATION_CACHE['BACKEND'] == 'django':
+    CACHES['generation'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'survey_generation_cache',
+        'TIMEOUT': GENERATION_CACHE['TTL_SECONDS'],
+        'OPTIONS': {'MAX_ENTRIES': GENERATION_CACHE['MAX_ENTRIES']},
+    }
+
+# Global limits for OpenAI API calls, shared by every connection of the process.
+# Calls beyond them wait in a queue of at most MAX_QUEUE, where question
+# regenerations go before full generations and connections take turns; waiting
+# clients get their position every POSITION_INTERVAL seconds. 0 disables a limit.
+OPENAI_SCHEDULER = {
+    'REQUESTS_PER_MINUTE': int(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', '500')),
+    'TOKENS_PER_MINUTE': int(os.environ.get('OPENAI_TOKENS_PER_MINUTE', '200000')),
+    'MAX_CONCURRENT': int(os.environ.get('OPENAI_MAX_CONCURRENT', '16')),
+    'MAX_QUEUE': int(os.environ.get('OPENAI_SCHEDULER_MAX_QUEUE', '200')),
+    'POSITION_INTERVAL': float(os.environ.get('OPENAI_SCHEDULER_POSITION_INTERVAL', '1')),
+}
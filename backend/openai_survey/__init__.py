@@ -1,6 +1,7 @@
-from .client import get_openai_client
+from .client import get_async_openai_client, get_openai_client
 from .generators import SurveyGenerator
 from .processors import SurveyProcessor
+from .stream_parser import SurveyStreamParser
 from .schemas import (
     SurveySchema,
     QuestionSchema,
@@ -11,8 +12,10 @@ from .schemas import (
 
 __all__ = [
     "get_openai_client",
+    "get_async_openai_client",
     "SurveyGenerator",
     "SurveyProcessor",
+    "SurveyStreamParser",
     "SurveySchema",
     "QuestionSchema",
     "OptionSchema",
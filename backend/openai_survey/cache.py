@@ -0,0 +1,212 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .schemas import SurveyGenerationRequest, SurveySchema
+
+
+class MemoryGenerationBackend:
+    """Thread-safe per-process LRU store of cached surveys with expiry times."""
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries: Maximum number of cached surveys
+        """
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached value that has not expired and mark it as recently used."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value for ttl seconds, evicting least recently used entries."""
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (value, time.monotonic() + ttl)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: int) -> None:
+        self.set(key, value, ttl)
+
+
+class DjangoCacheGenerationBackend:
+    """
+    Stores cached surveys in a Django cache, shared by every worker using it.
+
+    With a DatabaseCache alias the entries live in the database. Entries expire
+    ttl seconds after they were stored. When the cache holds more than its
+    MAX_ENTRIES, Django culls a fraction of the entries in key order, not by
+    last use.
+    """
+
+    def __init__(self, alias: str):
+        """
+        Initialize the backend.
+
+        Args:
+            alias: Name of the cache in settings.CACHES
+        """
+        self.alias = alias
+
+    def get(self, key: str) -> Optional[str]:
+        return caches[self.alias].get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        caches[self.alias].set(key, value, ttl)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await caches[self.alias].aget(key)
+
+    async def aset(self, key: str, value: str, ttl: int) -> None:
+        await caches[self.alias].aset(key, value, ttl)
+
+
+class GenerationCache:
+    """
+    Exact-match cache of generated surveys.
+
+    Entries are keyed by the normalized generation request and the model, and
+    store the validated survey, so repeating a request does not call OpenAI again.
+    """
+
+    def __init__(self, backend: Any, ttl: int):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: MemoryGenerationBackend, DjangoCacheGenerationBackend or any
+                object with the same get/set/aget/aset methods
+            ttl: Seconds a generated survey stays cached
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(request: SurveyGenerationRequest, model: str) -> str:
+        """
+        Build the cache key of a generation request.
+
+        The prompt is compared case-insensitively with whitespace collapsed.
+
+        Args:
+            request: The survey generation request
+            model: Name of the model generating the survey
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            [
+                " ".join(request.prompt.split()).casefold(),
+                (request.template or "general").lower(),
+                request.num_questions,
+                (request.language or "").lower(),
+                model,
+            ]
+        )
+        return (
+            "survey-generation:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        )
+
+    def get(
+        self, request: SurveyGenerationRequest, model: str
+    ) -> Optional[SurveySchema]:
+        """Return the cached survey of a request, or None on a miss."""
+        return self._decode(self.backend.get(self.make_key(request, model)))
+
+    def set(
+        self, request: SurveyGenerationRequest, model: str, survey: SurveySchema
+    ) -> None:
+        """Cache the survey generated for a request."""
+        self.backend.set(
+            self.make_key(request, model), survey.model_dump_json(), self.ttl
+        )
+
+    async def aget(
+        self, request: SurveyGenerationRequest, model: str
+    ) -> Optional[SurveySchema]:
+        """Async version of get()."""
+        return self._decode(await self.backend.aget(self.make_key(request, model)))
+
+    async def aset(
+        self, request: SurveyGenerationRequest, model: str, survey: SurveySchema
+    ) -> None:
+        """Async version of set()."""
+        await self.backend.aset(
+            self.make_key(request, model), survey.model_dump_json(), self.ttl
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dictionary with hits, misses and hit_rate
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _decode(self, value: Optional[str]) -> Optional[SurveySchema]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            return None
+        return SurveySchema.model_validate_json(value)
+
+
+@lru_cache(maxsize=1)
+def get_generation_cache() -> Optional[GenerationCache]:
+    """
+    Get or create the process-wide generation cache configured in
+    settings.GENERATION_CACHE.
+
+    Returns:
+        The generation cache, or None if it is disabled
+    """
+    config = getattr(settings, "GENERATION_CACHE", {})
+    backend_name = config.get("BACKEND", "memory")
+    ttl = config.get("TTL_SECONDS", 24 * 3600)
+    if backend_name == "memory":
+        backend = MemoryGenerationBackend(config.get("MAX_ENTRIES", 1000))
+    elif backend_name == "django":
+        backend = DjangoCacheGenerationBackend(config.get("CACHE_ALIAS", "default"))
+    else:
+        return None
+    return GenerationCache(backend, ttl=ttl)
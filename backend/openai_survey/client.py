@@ -1,11 +1,22 @@
 import os
 from functools import lru_cache
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from .exceptions import APIKeyError
 
 
+def _get_api_key() -> str:
+    api_key = os.environ.get("OPENAI_API_KEY")
+
+    if not api_key:
+        raise APIKeyError(
+            "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
+        )
+
+    return api_key
+
+
 @lru_cache(maxsize=1)
 def get_openai_client() -> OpenAI:
     """
@@ -17,14 +28,21 @@ def get_openai_client() -> OpenAI:
     Raises:
         APIKeyError: If the OpenAI API key is missing
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
+    return OpenAI(api_key=_get_api_key())
 
-    if not api_key:
-        raise APIKeyError(
-            "OpenAI API key not found. Please set the OPENAI_API_KEY environment variable."
-        )
 
-    return OpenAI(api_key=api_key)
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Get or create an asyncio OpenAI client instance.
+
+    Returns:
+        An initialized AsyncOpenAI client
+
+    Raises:
+        APIKeyError: If the OpenAI API key is missing
+    """
+    return AsyncOpenAI(api_key=_get_api_key())
 
 
 def get_default_model() -> str:
@@ -10,6 +10,12 @@ class GenerationError(OpenAIError):
     pass
 
 
+class SchedulerSaturated(GenerationError):
+    """Too many calls are waiting for OpenAI capacity."""
+
+    pass
+
+
 class SchemaValidationError(OpenAIError):
     """Error validating the JSON schema."""
 
@@ -1,8 +1,13 @@
+import asyncio
 import json
-from typing import Optional, Iterator, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
-from .client import get_openai_client, get_default_model
-from .exceptions import GenerationError, SchemaValidationError
+from openai import AsyncOpenAI, OpenAI
+from pydantic import ValidationError
+
+from .cache import GenerationCache, get_generation_cache
+from .client import get_async_openai_client, get_openai_client, get_default_model
+from .exceptions import GenerationError, SchedulerSaturated, SchemaValidationError
 from .prompts import (
     get_survey_system_prompt,
     get_question_regeneration_prompt,
@@ -15,20 +20,88 @@ from .schemas import (
     QuestionSchema,
     OptionSchema,
 )
+from .scheduler import (
+    PRIORITY_GENERATE,
+    PRIORITY_REGENERATE,
+    OpenAIScheduler,
+    QueuedCallback,
+    estimate_tokens,
+    get_scheduler,
+)
+from .singleflight import get_single_flight
 
 
 class SurveyGenerator:
     """Generator for creating surveys using OpenAI."""
 
-    def __init__(self, model: Optional[str] = None):
+    # Characters per chunk when a cached survey is replayed as a stream
+    REPLAY_CHUNK_SIZE = 32
+
+    # Expected completion tokens, for the scheduler's token estimates
+    COMPLETION_TOKENS_BASE = 100
+    COMPLETION_TOKENS_PER_QUESTION = 80
+    REGENERATION_COMPLETION_TOKENS = 150
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        client: Optional[OpenAI] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        cache: Optional[GenerationCache] = None,
+        scheduler: Optional[OpenAIScheduler] = None,
+        owner: Any = None,
+        on_queued: Optional[QueuedCallback] = None,
+    ):
         """
         Initialize the survey generator.
 
         Args:
             model: Optional model name to use. If None, the default model will be used.
+            client: Optional OpenAI client. If None, the shared client is used.
+            async_client: Optional AsyncOpenAI client used by astream(). If None,
+                the shared async client is used.
+            cache: Optional generation cache. If None, the shared cache configured
+                in settings.GENERATION_CACHE is used.
+            scheduler: Optional scheduler limiting API calls. If None, the shared
+                scheduler configured in settings.OPENAI_SCHEDULER is used.
+            owner: Identifies the connection the calls are made for, so the
+                scheduler shares capacity fairly between connections
+            on_queued: Optional callable called with the queue position and the
+                estimated wait in seconds while a call waits for the scheduler.
+                May be called from any thread.
         """
-        self.client = get_openai_client()
+        self.client = client or get_openai_client()
+        self.async_client = async_client or get_async_openai_client()
         self.model = model or get_default_model()
+        self.cache = cache or get_generation_cache()
+        self.scheduler = scheduler or get_scheduler()
+        self.owner = owner
+        self.on_queued = on_queued
+
+    def _survey_messages(
+        self, request: SurveyGenerationRequest
+    ) -> List[Dict[str, Any]]:
+        system_prompt = get_survey_system_prompt(
+            template=request.template,
+            num_questions=request.num_questions,
+            language=request.language,
+        )
+        return [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": f"Create a survey about: {request.prompt}",
+            },
+        ]
+
+    def _survey_tokens(
+        self, request: SurveyGenerationRequest, messages: List[Dict[str, Any]]
+    ) -> int:
+        return estimate_tokens(
+            messages,
+            self.COMPLETION_TOKENS_BASE
+            + self.COMPLETION_TOKENS_PER_QUESTION * request.num_questions,
+        )
 
     def generate(
         self, request: SurveyGenerationRequest, stream: bool = False
@@ -42,38 +115,44 @@ class SurveyGenerator:
 
         Returns:
             If stream=False: A response containing the generated survey
-            If stream=True: An iterator yielding response chunks
+            If stream=True: An iterator yielding response chunks. The API call is
+                made when iteration starts, and its scheduler slot is held until
+                the iterator is exhausted or closed.
 
         Raises:
             GenerationError: If there's an error during generation
             SchemaValidationError: If the generated survey doesn't match the expected schema
         """
-        try:
-            system_prompt = get_survey_system_prompt(
-                template=request.template,
-                num_questions=request.num_questions,
-                language=request.language,
-            )
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": f"Create a survey about: {request.prompt}",
-                    },
-                ],
-                stream=stream,
-            )
+        if stream:
+            return self._stream_survey(request)
+
+        if self.cache is not None:
+            cached = self.cache.get(request, self.model)
+            if cached is not None:
+                return SurveyGenerationResponse(
+                    survey=cached, prompt=request.prompt, model=self.model
+                )
 
-            if stream:
-                return response
+        try:
+            messages = self._survey_messages(request)
+            with self.scheduler.slot(
+                PRIORITY_GENERATE,
+                self.owner,
+                self._survey_tokens(request, messages),
+                self.on_queued,
+            ) as ticket:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                )
+                ticket.record_usage(response)
 
             content = response.choices[0].message.content
             survey_data = json.loads(content)
             survey = SurveySchema.model_validate(survey_data)
+            if self.cache is not None:
+                self.cache.set(request, self.model, survey)
 
             return SurveyGenerationResponse(
                 survey=survey, prompt=request.prompt, model=self.model
@@ -81,12 +160,110 @@ class SurveyGenerator:
 
         except json.JSONDecodeError as e:
             raise SchemaValidationError(f"Invalid JSON response from OpenAI: {str(e)}")
+        except SchedulerSaturated:
+            raise
         except Exception as e:
             if "validation error" in str(e).lower():
                 raise SchemaValidationError(f"Schema validation error: {str(e)}")
             else:
                 raise GenerationError(f"Error generating survey: {str(e)}")
 
+    def _stream_survey(self, request: SurveyGenerationRequest) -> Iterator[Any]:
+        messages = self._survey_messages(request)
+        with self.scheduler.slot(
+            PRIORITY_GENERATE,
+            self.owner,
+            self._survey_tokens(request, messages),
+            self.on_queued,
+        ) as ticket:
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                for chunk in stream:
+                    # The last chunk carries the usage and no choices
+                    if getattr(chunk, "usage", None) is not None:
+                        ticket.record_usage(chunk)
+                    if chunk.choices:
+                        yield chunk
+            except Exception as e:
+                raise GenerationError(f"Error generating survey: {str(e)}")
+
+    async def astream(self, request: SurveyGenerationRequest) -> AsyncIterator[str]:
+        """
+        Stream the JSON of a generated survey without blocking the event loop.
+
+        Uses the AsyncOpenAI client, so waiting for the next chunk suspends only
+        the calling coroutine. A cached survey for the same request is replayed in
+        small chunks instead, so callers handle both cases the same way.
+        Concurrent identical requests share one upstream stream through the
+        single-flight coordinator.
+
+        Args:
+            request: The survey generation request
+
+        Returns:
+            An async iterator yielding the content of each response chunk
+
+        Raises:
+            GenerationError: If there's an error during generation
+        """
+        if self.cache is not None:
+            cached = await self.cache.aget(request, self.model)
+            if cached is not None:
+                content = cached.model_dump_json()
+                for start in range(0, len(content), self.REPLAY_CHUNK_SIZE):
+                    yield content[start : start + self.REPLAY_CHUNK_SIZE]
+                    await asyncio.sleep(0)
+                return
+
+        key = GenerationCache.make_key(request, self.model)
+        async for content in get_single_flight().stream(
+            key, lambda: self._astream_upstream(request)
+        ):
+            yield content
+
+    async def _astream_upstream(
+        self, request: SurveyGenerationRequest
+    ) -> AsyncIterator[str]:
+        parts = []
+        messages = self._survey_messages(request)
+        # The slot is held until the stream ends, so MAX_CONCURRENT counts
+        # streams in progress
+        async with self.scheduler.aslot(
+            PRIORITY_GENERATE,
+            self.owner,
+            self._survey_tokens(request, messages),
+            self.on_queued,
+        ) as ticket:
+            try:
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        ticket.record_usage(chunk)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                raise GenerationError(f"Error generating survey: {str(e)}")
+
+        if self.cache is not None:
+            try:
+                survey = SurveySchema.model_validate_json("".join(parts))
+            except ValidationError:
+                return
+            await self.cache.aset(request, self.model, survey)
+
     def generate_from_free_text_stream(
         self, free_text: str
     ) -> Iterator[Union[str, SurveyGenerationResponse]]:
@@ -106,14 +283,22 @@ class SurveyGenerator:
         try:
             analysis_prompt = get_free_text_analysis_prompt()
 
-            analysis_response = self.client.chat.completions.create(
-                model=self.model,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": analysis_prompt},
-                    {"role": "user", "content": free_text},
-                ],
-            )
+            messages = [
+                {"role": "system", "content": analysis_prompt},
+                {"role": "user", "content": free_text},
+            ]
+            with self.scheduler.slot(
+                PRIORITY_GENERATE,
+                self.owner,
+                estimate_tokens(messages, self.COMPLETION_TOKENS_BASE),
+                self.on_queued,
+            ) as ticket:
+                analysis_response = self.client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                )
+                ticket.record_usage(analysis_response)
 
             content = analysis_response.choices[0].message.content
             params = json.loads(content)
@@ -234,11 +419,19 @@ class SurveyGenerator:
                 feedback=feedback,
             )
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                response_format={"type": "json_object"},
-                messages=[{"role": "system", "content": system_prompt}],
-            )
+            messages = [{"role": "system", "content": system_prompt}]
+            with self.scheduler.slot(
+                PRIORITY_REGENERATE,
+                self.owner,
+                estimate_tokens(messages, self.REGENERATION_COMPLETION_TOKENS),
+                self.on_queued,
+            ) as ticket:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                )
+                ticket.record_usage(response)
 
             content = response.choices[0].message.content
             new_question_data = json.loads(content)
@@ -274,5 +467,7 @@ class SurveyGenerator:
             raise SchemaValidationError(f"Invalid JSON response from OpenAI: {str(e)}")
         except ValueError as e:
             raise e
+        except SchedulerSaturated:
+            raise
         except Exception as e:
             raise GenerationError(f"Error regenerating question: {str(e)}")
@@ -0,0 +1,415 @@
+import asyncio
+import bisect
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from .exceptions import SchedulerSaturated
+
+# Lower values are served first
+PRIORITY_REGENERATE = 0
+PRIORITY_GENERATE = 1
+
+# Rough size of a token in characters, used to estimate prompt tokens
+CHARS_PER_TOKEN = 4
+
+QueuedCallback = Callable[[int, float], None]
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], completion_tokens: int) -> int:
+    """
+    Estimate the tokens a chat completion will use.
+
+    Args:
+        messages: The chat messages sent to the API
+        completion_tokens: Expected number of tokens in the completion
+
+    Returns:
+        Estimated prompt plus completion tokens
+    """
+    characters = sum(len(message.get("content") or "") for message in messages)
+    return characters // CHARS_PER_TOKEN + completion_tokens
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    The bucket holds at most one minute worth of tokens. Taking more than is
+    available leaves it negative, so the debt is paid back before later takers
+    are let through. Not thread-safe on its own.
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Tokens added per minute, which is also the capacity
+        """
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last refill."""
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount tokens are available, after the last refill."""
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def time_until_total(self, amount: float) -> float:
+        """Seconds until amount tokens will have been available in total."""
+        missing = amount - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Remove tokens, possibly leaving the bucket negative."""
+        self.level -= amount
+
+
+class _Ticket:
+    """One call waiting for, or holding, capacity."""
+
+    def __init__(
+        self,
+        priority: int,
+        owner: Any,
+        tokens: int,
+        round_: int,
+        seq: int,
+        wake: Callable[[], None],
+    ):
+        self.priority = priority
+        self.owner = owner
+        self.tokens = tokens
+        self.key = (priority, round_, seq)
+        self.wake = wake
+        self.granted = False
+        self.used_tokens: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+
+    def record_usage(self, response: Any) -> None:
+        """Remember the tokens a completion actually used, if it reports them."""
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None) is not None:
+            self.used_tokens = usage.total_tokens
+
+
+class OpenAIScheduler:
+    """
+    Global limiter and fair scheduler for OpenAI API calls.
+
+    Calls are let through while the requests-per-minute and tokens-per-minute
+    token buckets have capacity and fewer than max_concurrent calls are running;
+    the others wait in a queue of at most max_queue calls. The queue is ordered
+    by priority first, so short question regenerations overtake full survey
+    generations. Within a priority, calls are served round-robin between owners
+    (one per WebSocket connection), so a connection sending many requests does
+    not hold up the others.
+
+    Waiting calls are told their position in the queue and an estimate of the
+    wait. Token use is estimated up front and corrected with the usage the API
+    reports, when it does.
+
+    Can be used both from worker threads (slot()) and from async code (aslot()).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrent: int,
+        max_queue: int,
+        position_interval: float = 1.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Maximum API calls started per minute, 0 for no limit
+            tokens_per_minute: Maximum tokens used per minute, 0 for no limit
+            max_concurrent: Maximum calls running at once, 0 for no limit
+            max_queue: Maximum calls waiting for capacity
+            position_interval: Seconds between checks of a waiting call's position
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.position_interval = position_interval
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiting: List[Tuple[Tuple[int, int, int], _Ticket]] = []
+        self._round = 0
+        self._owner_rounds: Dict[Any, int] = {}
+        self._active = 0
+        self._granted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        # Moving average of call durations, for wait estimates
+        self._avg_duration = 0.0
+
+    @contextmanager
+    def slot(
+        self,
+        priority: int,
+        owner: Any = None,
+        tokens: int = 0,
+        on_queued: Optional[QueuedCallback] = None,
+    ) -> Iterator[_Ticket]:
+        """
+        Block the calling thread until the call may start and hold its slot.
+
+        Args:
+            priority: PRIORITY_REGENERATE or PRIORITY_GENERATE
+            owner: Identifies the connection making the call, for fairness
+            tokens: Estimated tokens the call will use
+            on_queued: Optional callable called with the queue position and the
+                estimated wait in seconds while the call waits, whenever the
+                position changes. May be called from any thread.
+
+        Returns:
+            A context manager yielding the ticket of the call. Call
+            ticket.record_usage(response) inside it to correct the token estimate.
+
+        Raises:
+            SchedulerSaturated: If max_queue calls are already waiting
+        """
+        event = threading.Event()
+        ticket = self._enqueue(priority, owner, tokens, event.set)
+        try:
+            reported = None
+            while True:
+                state = self._poll(ticket)
+                if state is None:
+                    break
+                position, wait, timeout = state
+                if on_queued is not None and position != reported:
+                    reported = position
+                    on_queued(position, wait)
+                event.wait(timeout)
+                event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(
+        self,
+        priority: int,
+        owner: Any = None,
+        tokens: int = 0,
+        on_queued: Optional[QueuedCallback] = None,
+    ) -> AsyncIterator[_Ticket]:
+        """Async version of slot(); waiting suspends only the calling coroutine."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket = self._enqueue(
+            priority, owner, tokens, lambda: loop.call_soon_threadsafe(event.set)
+        )
+        try:
+            reported = None
+            while True:
+                state = self._poll(ticket)
+                if state is None:
+                    break
+                position, wait, timeout = state
+                if on_queued is not None and position != reported:
+                    reported = position
+                    on_queued(position, wait)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth, running calls, bucket levels and waits."""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket.refill(now)
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "queued_regenerations": sum(
+                    1
+                    for _, ticket in self._waiting
+                    if ticket.priority == PRIORITY_REGENERATE
+                ),
+                "max_queue": self.max_queue,
+                "granted": self._granted,
+                "rejected": self._rejected,
+                "requests_available": (
+                    self.requests.level if self.requests is not None else None
+                ),
+                "tokens_available": (
+                    self.tokens.level if self.tokens is not None else None
+                ),
+                "avg_wait_seconds": (
+                    self._total_wait / self._granted if self._granted else 0.0
+                ),
+                "max_wait_seconds": self._max_wait,
+            }
+
+    def _enqueue(
+        self, priority: int, owner: Any, tokens: int, wake: Callable[[], None]
+    ) -> _Ticket:
+        with self._lock:
+            if len(self._waiting) >= self.max_queue:
+                self._rejected += 1
+                raise SchedulerSaturated(
+                    f"{len(self._waiting)} calls are already waiting for OpenAI capacity"
+                )
+            # Each owner gets one call per round, so owners take turns
+            round_ = max(self._round, self._owner_rounds.get(owner, 0))
+            self._owner_rounds[owner] = round_ + 1
+            ticket = _Ticket(priority, owner, tokens, round_, next(self._seq), wake)
+            bisect.insort(self._waiting, (ticket.key, ticket))
+            self._dispatch()
+            return ticket
+
+    def _poll(self, ticket: _Ticket) -> Optional[Tuple[int, float, float]]:
+        """
+        Let through the calls that fit and report on a waiting one.
+
+        Returns:
+            None if the ticket was granted, otherwise its 1-based position, the
+            estimated wait and how long to sleep before polling again
+        """
+        with self._lock:
+            self._dispatch()
+            if ticket.granted:
+                return None
+            index = self._waiting.index((ticket.key, ticket))
+            wait = self._estimate_wait(index)
+        timeout = (
+            min(wait, self.position_interval) if wait > 0 else self.position_interval
+        )
+        return index + 1, wait, timeout
+
+    def _dispatch(self) -> None:
+        """Grant waiting calls in queue order while there is capacity. Needs the lock."""
+        now = time.monotonic()
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.refill(now)
+
+        granted_any = False
+        while self._waiting:
+            ticket = self._waiting[0][1]
+            if self.max_concurrent and self._active >= self.max_concurrent:
+                break
+            if self.requests is not None and self.requests.time_until(1) > 0:
+                break
+            if self.tokens is not None and self.tokens.time_until(ticket.tokens) > 0:
+                break
+
+            self._waiting.pop(0)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(ticket.tokens)
+            self._active += 1
+            self._granted += 1
+            self._round = max(self._round, ticket.key[1])
+            waited = now - ticket.enqueued_at
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            ticket.started_at = now
+            ticket.granted = True
+            ticket.wake()
+            granted_any = True
+
+        if granted_any:
+            # Owners whose next round has been reached need no entry
+            self._owner_rounds = {
+                owner: round_
+                for owner, round_ in self._owner_rounds.items()
+                if round_ > self._round
+            }
+
+    def _estimate_wait(self, index: int) -> float:
+        """Estimate the seconds until the call at index starts. Needs the lock."""
+        ahead = [ticket for _, ticket in self._waiting[: index + 1]]
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.time_until_total(len(ahead)))
+        if self.tokens is not None:
+            needed = sum(ticket.tokens for ticket in ahead)
+            wait = max(wait, self.tokens.time_until_total(needed))
+        if self.max_concurrent:
+            free = self.max_concurrent - self._active
+            if len(ahead) > free:
+                batches = math.ceil((len(ahead) - free) / self.max_concurrent)
+                wait = max(wait, batches * self._avg_duration)
+        return wait
+
+    def _abandon(self, ticket: _Ticket) -> None:
+        with self._lock:
+            granted = ticket.granted
+            if not granted:
+                self._waiting.remove((ticket.key, ticket))
+        # Granted while the waiter was being cancelled
+        if granted:
+            self._release(ticket)
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._active -= 1
+            duration = time.monotonic() - ticket.started_at
+            if self._avg_duration:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            else:
+                self._avg_duration = duration
+            if self.tokens is not None and ticket.used_tokens is not None:
+                self.tokens.take(ticket.used_tokens - ticket.tokens)
+            self._dispatch()
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> OpenAIScheduler:
+    """
+    Get or create the process-wide scheduler configured in settings.OPENAI_SCHEDULER.
+
+    Returns:
+        The scheduler instance
+    """
+    config = getattr(settings, "OPENAI_SCHEDULER", {})
+    return OpenAIScheduler(
+        requests_per_minute=config.get("REQUESTS_PER_MINUTE", 500),
+        tokens_per_minute=config.get("TOKENS_PER_MINUTE", 200000),
+        max_concurrent=config.get("MAX_CONCURRENT", 16),
+        max_queue=config.get("MAX_QUEUE", 200),
+        position_interval=config.get("POSITION_INTERVAL", 1.0),
+    )
@@ -0,0 +1,120 @@
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from .exceptions import GenerationError
+
+
+class _Flight:
+    """One upstream stream and the chunks it produced so far."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+
+class StreamSingleFlight:
+    """
+    Shares one upstream stream between concurrent identical requests.
+
+    The first caller for a key starts the upstream stream in a background task.
+    Callers arriving while it is running subscribe to the same flight: they first
+    get every chunk produced so far and then follow new chunks as they arrive, so
+    each of them sees the complete stream. Errors are raised to every subscriber,
+    and so is a GenerationError if the upstream task is cancelled (for example on
+    shutdown), so no subscriber mistakes a cut-off stream for a complete one.
+    Subscribers leaving, the first one included, do not cancel the upstream, so
+    the others keep receiving and its result can still be cached.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        """Initialize the coordinator with no flights in progress."""
+        self.started = 0
+        self.joined = 0
+        self._flights: Dict[str, _Flight] = {}
+
+    async def stream(
+        self, key: str, upstream: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Stream the chunks for a key, starting the upstream only if needed.
+
+        Args:
+            key: Identifies identical requests
+            upstream: Called without arguments to start the upstream async
+                iterator when no flight for the key is running
+
+        Returns:
+            An async iterator over the chunks of the shared stream
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(key, flight, upstream))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        index = 0
+        while True:
+            async with flight.condition:
+                await flight.condition.wait_for(
+                    lambda: index < len(flight.chunks) or flight.done
+                )
+                chunks = flight.chunks[index:]
+                done = flight.done
+
+            for chunk in chunks:
+                yield chunk
+            index += len(chunks)
+
+            if done and index == len(flight.chunks):
+                if flight.error is not None:
+                    raise flight.error
+                return
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of upstream streams started, joins and running flights."""
+        return {
+            "started": self.started,
+            "joined": self.joined,
+            "in_flight": len(self._flights),
+        }
+
+    async def _pump(
+        self, key: str, flight: _Flight, upstream: Callable[[], AsyncIterator[str]]
+    ) -> None:
+        try:
+            async for chunk in upstream():
+                async with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except asyncio.CancelledError:
+            flight.error = GenerationError("The generation stream was cancelled")
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            # Requests arriving from now on start a new flight (or hit the cache)
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            async with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+
+@lru_cache(maxsize=1)
+def get_single_flight() -> StreamSingleFlight:
+    """
+    Get or create the process-wide single-flight coordinator for generation streams.
+
+    Returns:
+        The coordinator instance
+    """
+    return StreamSingleFlight()
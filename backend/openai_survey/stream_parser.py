@@ -0,0 +1,177 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .schemas import QuestionSchema
+
+logger = logging.getLogger(__name__)
+
+TITLE_FIELDS = ("title", "description")
+
+
+class SurveyStreamParser:
+    """
+    Incremental parser for the survey JSON streamed by SurveyGenerator.
+
+    Chunks are scanned once as they arrive. The parser tracks string and nesting
+    state, so it knows when the top-level title and each object of the
+    "questions" array are complete, and reports them as events without waiting
+    for the rest of the document.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.title: Optional[str] = None
+        self.description: Optional[str] = None
+        self.questions: List[QuestionSchema] = []
+
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._capture: Optional[List[str]] = None
+        self._capture_kind: Optional[str] = None
+        self._in_questions = False
+        self._questions_seen = 0
+        self._questions_started = False
+        self._title_sent = False
+
+    @property
+    def content(self) -> str:
+        """All content fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next chunk of the stream.
+
+        Args:
+            chunk: Content of one stream chunk
+
+        Returns:
+            Events completed by this chunk, in order. Each is a dictionary with a
+            "type" of "title_ready" (with "title" and "description") or
+            "question_ready" (with the "index" of the question in the array and
+            the validated "question").
+        """
+        self._parts.append(chunk)
+        events = []
+        for char in chunk:
+            self._consume(char, events)
+        return events
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Parse the complete document once the stream has ended.
+
+        Returns:
+            The decoded survey JSON
+
+        Raises:
+            json.JSONDecodeError: If the streamed content is not valid JSON
+        """
+        return json.loads(self.content)
+
+    def _consume(self, char: str, events: List[Dict[str, Any]]) -> None:
+        if self._capture is not None:
+            self._capture.append(char)
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._capture_kind in ("key", "field"):
+                    self._finish_string(events)
+            return
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._capture is None:
+                if self._expect_key:
+                    self._start_capture("key", char)
+                elif self._key in TITLE_FIELDS:
+                    self._start_capture("field", char)
+        elif char in "{[":
+            self._depth += 1
+            if self._depth == 1:
+                self._expect_key = True
+            elif self._depth == 2 and char == "[" and self._key == "questions":
+                self._in_questions = True
+                self._questions_started = True
+                self._maybe_send_title(events)
+            elif self._depth == 3 and char == "{" and self._in_questions:
+                self._start_capture("question", char)
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 2 and self._capture_kind == "question":
+                self._finish_question(events)
+            elif self._depth == 1 and self._in_questions:
+                self._in_questions = False
+            elif self._depth == 0:
+                self._questions_started = True
+                self._maybe_send_title(events)
+        elif self._depth == 1 and char == ":":
+            self._expect_key = False
+        elif self._depth == 1 and char == ",":
+            self._expect_key = True
+
+    def _start_capture(self, kind: str, char: str) -> None:
+        self._capture = [char]
+        self._capture_kind = kind
+
+    def _take_capture(self) -> str:
+        text = "".join(self._capture)
+        self._capture = None
+        self._capture_kind = None
+        return text
+
+    def _finish_string(self, events: List[Dict[str, Any]]) -> None:
+        kind = self._capture_kind
+        value = json.loads(self._take_capture())
+        if kind == "key":
+            self._key = value
+        else:
+            setattr(self, self._key, value)
+            self._maybe_send_title(events)
+
+    def _finish_question(self, events: List[Dict[str, Any]]) -> None:
+        text = self._take_capture()
+        index = self._questions_seen
+        self._questions_seen += 1
+        try:
+            question = QuestionSchema.model_validate(json.loads(text))
+        except (json.JSONDecodeError, ValidationError) as e:
+            # Left to the final parse of the document to report
+            logger.warning("Skipping invalid streamed question: %s", e)
+            return
+
+        self.questions.append(question)
+        events.append(
+            {
+                "type": "question_ready",
+                "index": index,
+                "question": question,
+            }
+        )
+
+    def _maybe_send_title(self, events: List[Dict[str, Any]]) -> None:
+        """Send the title once it is known and the description is known or skipped."""
+        if self._title_sent or self.title is None:
+            return
+        if self.description is None and not self._questions_started:
+            return
+        self._title_sent = True
+        events.append(
+            {
+                "type": "title_ready",
+                "title": self.title,
+                "description": self.description,
+            }
+        )
@@ -1,11 +1,27 @@
 from django.contrib import admin
 
+from .counters import get_live_response_count, with_live_response_count
 from .models import Survey, Question, Option, Response, Answer
+from .partitions import delete_survey
 
 
 class SurveyAdmin(admin.ModelAdmin):
-    list_display = ('title', 'created_at', 'public_id', 'response_count')
-    readonly_fields = ('public_id', 'response_count')
+    list_display = ('title', 'created_at', 'public_id', 'live_response_count')
+    readonly_fields = ('public_id', 'live_response_count')
+
+    def get_queryset(self, request):
+        return with_live_response_count(super().get_queryset(request))
+
+    @admin.display(description='Response count', ordering='live_response_count')
+    def live_response_count(self, obj):
+        return get_live_response_count(obj)
+
+    def delete_model(self, request, obj):
+        delete_survey(obj)
+
+    def delete_queryset(self, request, queryset):
+        for survey in queryset:
+            delete_survey(survey)
 
 admin.site.register(Survey, SurveyAdmin)
 admin.site.register(Question)
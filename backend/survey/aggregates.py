@@ -0,0 +1,228 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import (
+    Answer,
+    Option,
+    OptionAggregate,
+    Question,
+    QuestionAggregate,
+    Response,
+    Survey,
+)
+
+
+def is_answered(text_answer: Optional[str], option_ids: Iterable[int]) -> bool:
+    """Return whether an answer carries any content."""
+    return bool(option_ids) or bool(text_answer and text_answer.strip())
+
+
+class AggregateDelta:
+    """
+    Accumulates aggregate increments for one or more submitted responses.
+
+    Only the aggregate rows of answered questions and selected options are
+    written. They are locked in id order first, so concurrent submissions to the
+    same survey cannot deadlock on them, and then updated with one UPDATE per
+    distinct increment. Skipped counts are not stored; they are derived from the
+    response count when the aggregates are read.
+
+    The rows themselves are created with their question or option.
+    """
+
+    def __init__(self, survey_id: int, question_ids: Iterable[int], sign: int = 1):
+        """
+        Initialize the delta.
+
+        Args:
+            survey_id: ID of the survey the responses belong to
+            question_ids: IDs of all questions in the survey
+            sign: 1 to add the responses to the aggregates, -1 to remove them
+        """
+        self.survey_id = survey_id
+        self.question_ids = set(question_ids)
+        self.sign = sign
+        self.response_count = 0
+        self.answered = Counter()
+        self.options = Counter()
+
+    def add_response(self, answers: Iterable[Tuple[int, Optional[str], List[int]]]):
+        """
+        Add one response to the delta.
+
+        Args:
+            answers: Iterable of (question_id, text_answer, selected_option_ids)
+        """
+        self.response_count += 1
+
+        answered_questions = set()
+        selected_options = set()
+        for question_id, text_answer, option_ids in answers:
+            if question_id not in self.question_ids:
+                continue
+            if is_answered(text_answer, option_ids):
+                answered_questions.add(question_id)
+            selected_options.update(option_ids)
+
+        self.answered.update(answered_questions)
+        self.options.update(selected_options)
+
+    def apply(self) -> None:
+        """Write the accumulated increments. Must run inside the submission transaction."""
+        # Question rows are always locked before option rows
+        self._increment(
+            QuestionAggregate, "question_id", "answered_count", self.answered
+        )
+        self._increment(OptionAggregate, "option_id", "count", self.options)
+
+    def _increment(self, model, key: str, field: str, counts: Counter) -> None:
+        if not counts:
+            return
+
+        list(
+            model.objects.select_for_update()
+            .filter(**{f"{key}__in": counts})
+            .order_by(key)
+            .values_list("id", flat=True)
+        )
+
+        by_increment = defaultdict(list)
+        for object_id, count in counts.items():
+            by_increment[count].append(object_id)
+        for count, object_ids in sorted(by_increment.items()):
+            model.objects.filter(**{f"{key}__in": object_ids}).update(
+                **{field: F(field) + self.sign * count}
+            )
+
+
+def remove_response_aggregates(response: Response) -> None:
+    """
+    Take a response that is about to be deleted out of the survey aggregates.
+
+    Args:
+        response: The response, with its answers still in the database
+    """
+    answers = list(
+        Answer.objects.filter(response=response).values_list(
+            "id", "question_id", "text_answer"
+        )
+    )
+    selected = defaultdict(list)
+    through = Answer.selected_options.through
+    for answer_id, option_id in through.objects.filter(
+        answer_id__in=[answer_id for answer_id, _, _ in answers]
+    ).values_list("answer_id", "option_id"):
+        selected[answer_id].append(option_id)
+
+    delta = AggregateDelta(
+        response.survey_id,
+        [question_id for _, question_id, _ in answers],
+        sign=-1,
+    )
+    delta.add_response(
+        (question_id, text_answer, selected[answer_id])
+        for answer_id, question_id, text_answer in answers
+    )
+    delta.apply()
+
+
+@transaction.atomic
+def rebuild_survey_aggregates(survey: Survey) -> Dict[str, int]:
+    """
+    Recompute the aggregates of a survey from its raw answers.
+
+    Args:
+        survey: The survey to rebuild
+
+    Returns:
+        Dictionary with the number of question and option aggregate rows written
+    """
+    has_text = Q(text_answer__isnull=False) & ~Q(text_answer__regex=r"^\s*$")
+    answered_counts = dict(
+        Answer.objects.filter(survey=survey)
+        .filter(has_text | Q(selected_options__isnull=False))
+        .values("question_id")
+        .annotate(total=Count("response_id", distinct=True))
+        .values_list("question_id", "total")
+    )
+
+    through = Answer.selected_options.through
+    option_counts = dict(
+        through.objects.filter(answer__survey=survey)
+        .values("option_id")
+        .annotate(total=Count("answer__response_id", distinct=True))
+        .values_list("option_id", "total")
+    )
+
+    QuestionAggregate.objects.filter(survey=survey).delete()
+    OptionAggregate.objects.filter(survey=survey).delete()
+
+    question_rows = [
+        QuestionAggregate(
+            survey=survey,
+            question_id=question_id,
+            answered_count=answered_counts.get(question_id, 0),
+        )
+        for question_id in Question.objects.filter(survey=survey).values_list(
+            "id", flat=True
+        )
+    ]
+    option_rows = [
+        OptionAggregate(
+            survey=survey,
+            question_id=question_id,
+            option_id=option_id,
+            count=option_counts.get(option_id, 0),
+        )
+        for option_id, question_id in Option.objects.filter(
+            question__survey=survey
+        ).values_list("id", "question_id")
+    ]
+
+    QuestionAggregate.objects.bulk_create(question_rows)
+    OptionAggregate.objects.bulk_create(option_rows)
+
+    return {"questions": len(question_rows), "options": len(option_rows)}
+
+
+def load_survey_aggregates(
+    survey: Survey, total_responses: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Read the aggregates of a survey in the format accepted by SurveyAnalyzer.
+
+    Args:
+        survey: The survey to read
+        total_responses: Current number of responses, used to check the aggregates
+            are complete
+
+    Returns:
+        Dictionary with question and option counts, or None if the aggregates are
+        missing or out of date and the raw answers should be used instead. Rows
+        are missing for surveys answered before aggregates were kept, until
+        rebuild_survey_aggregates has run.
+    """
+    question_ids = set(survey.questions.values_list("id", flat=True))
+
+    questions = {}
+    for question_id, answered in QuestionAggregate.objects.filter(
+        survey=survey
+    ).values_list("question_id", "answered_count"):
+        if answered > total_responses:
+            return None
+        questions[question_id] = {
+            "answered_count": answered,
+            "skipped_count": total_responses - answered,
+        }
+
+    if not question_ids.issubset(questions):
+        return None
+
+    options = dict(
+        OptionAggregate.objects.filter(survey=survey).values_list("option_id", "count")
+    )
+
+    return {"questions": questions, "options": options}
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingSender:
+    """
+    Ordered outbound queue of one WebSocket connection that batches stream chunks.
+
+    Generation chunks are buffered and sent as one "generation_chunk" frame when
+    window seconds have passed since the first buffered chunk or max_bytes have
+    been buffered. Any other message first flushes the buffer, so the client sees
+    frames in the order they were produced.
+
+    Frames are written by a single writer task from a queue of at most max_queue
+    frames. When a client falls behind and the queue is full, producers wait in
+    send_chunk()/send() until it drains instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        window: float,
+        max_bytes: int,
+        max_queue: int,
+    ):
+        """
+        Initialize the sender and start its writer task.
+
+        Args:
+            send: Coroutine function writing one text frame to the socket
+            window: Seconds chunks may wait in the buffer. 0 sends every chunk
+                in its own frame.
+            max_bytes: Buffered chunk bytes that trigger an immediate flush
+            max_queue: Maximum number of frames waiting to be written
+        """
+        self.window = window
+        self.max_bytes = max_bytes
+        self.frames = 0
+        self.bytes = 0
+        self.chunks = 0
+
+        self._send = send
+        self._buffer: List[str] = []
+        self._buffered_bytes = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._writer = asyncio.ensure_future(self._write_frames())
+
+    async def send_chunk(self, content: str) -> None:
+        """Buffer the content of one generation chunk."""
+        self.chunks += 1
+        if self.window <= 0:
+            await self._put({"type": "generation_chunk", "content": content})
+            return
+
+        self._buffer.append(content)
+        self._buffered_bytes += len(content.encode("utf-8"))
+        if self._buffered_bytes >= self.max_bytes:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    async def send(self, text_data: str) -> None:
+        """Flush buffered chunks, then queue an already serialized message."""
+        await self.flush()
+        await self._queue.put(text_data)
+
+    async def flush(self) -> None:
+        """Queue the buffered chunks as one frame."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        if not self._buffer:
+            return
+        content = "".join(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        await self._put({"type": "generation_chunk", "content": content})
+
+    async def close(self) -> None:
+        """Stop the writer. Frames that were not written yet are dropped."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of chunks received and frames and bytes written."""
+        return {"chunks": self.chunks, "frames": self.frames, "bytes": self.bytes}
+
+    async def _put(self, message: Dict[str, Any]) -> None:
+        await self._queue.put(json.dumps(message))
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def _write_frames(self) -> None:
+        while True:
+            frame = await self._queue.get()
+            try:
+                await self._send(frame)
+                self.frames += 1
+                self.bytes += len(frame.encode("utf-8"))
+            except Exception as e:
+                logger.warning("Failed to send WebSocket frame: %s", e)
+            finally:
+                self._queue.task_done()
@@ -1,19 +1,33 @@
 import asyncio
 import json
-from concurrent.futures import ThreadPoolExecutor
+import logging
 
-from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.db import transaction
 
 from openai_survey import SurveyGenerator, SurveyGenerationRequest
-from openai_survey.exceptions import GenerationError
+from openai_survey.exceptions import GenerationError, SchedulerSaturated
 from openai_survey.schemas import SurveySchema
+from openai_survey.stream_parser import SurveyStreamParser
+from survey.coalescing import CoalescingSender
+from survey.executor import ExecutorSaturated, get_blocking_executor
 from survey.models import Survey, Question, Option
 
+logger = logging.getLogger(__name__)
+
 
 class SurveyConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.accept()
+        self.loop = asyncio.get_running_loop()
+        config = settings.WEBSOCKET_SEND
+        self.sender = CoalescingSender(
+            self.send_frame,
+            window=config["WINDOW_MS"] / 1000,
+            max_bytes=config["MAX_BYTES"],
+            max_queue=config["MAX_QUEUE"],
+        )
         await self.send(
             text_data=json.dumps(
                 {
@@ -24,7 +38,25 @@ class SurveyConsumer(AsyncWebsocketConsumer):
         )
 
     async def disconnect(self, close_code):
-        pass
+        if getattr(self, "sender", None) is not None:
+            logger.debug("WebSocket send stats: %s", self.sender.stats())
+            await self.sender.close()
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        # Text messages go through the coalescing sender so they stay ordered
+        # after buffered generation chunks
+        if getattr(self, "sender", None) is not None and text_data and not close:
+            await self.sender.send(text_data)
+        else:
+            await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+
+    async def send_frame(self, text_data):
+        await super().send(text_data=text_data)
+
+    def get_generator(self):
+        return SurveyGenerator(
+            owner=self.channel_name, on_queued=self.notify_openai_queue
+        )
 
     async def receive(self, text_data):
         try:
@@ -81,31 +113,19 @@ class SurveyConsumer(AsyncWebsocketConsumer):
 
             print(f"Generating survey with prompt: {prompt}")
 
-            from openai_survey import get_openai_client
-
-            generator = SurveyGenerator()
+            generator = self.get_generator()
 
             if data.get("stream", True):
-                response = await self.run_in_thread(
-                    generator.generate, request=request, stream=True
-                )
-
-                collected_content = ""
-                for chunk in response:
-                    if (
-                        hasattr(chunk.choices[0], "delta")
-                        and chunk.choices[0].delta.content
-                    ):
-                        content = chunk.choices[0].delta.content
-                        collected_content += content
-                        await self.send(
-                            text_data=json.dumps(
-                                {"type": "generation_chunk", "content": content}
-                            )
-                        )
+                parser = SurveyStreamParser()
+                async for content in generator.astream(request):
+                    await self.sender.send_chunk(content)
+                    for event in parser.feed(content):
+                        if event["type"] == "question_ready":
+                            event["question"] = event["question"].model_dump()
+                        await self.send(text_data=json.dumps(event))
 
                 try:
-                    survey_data = json.loads(collected_content)
+                    survey_data = parser.finish()
 
                     await self.send(
                         text_data=json.dumps(
@@ -122,7 +142,7 @@ class SurveyConsumer(AsyncWebsocketConsumer):
                         )
                     )
                     print(f"JSON parsing error: {e}")
-                    print(f"Received content: {collected_content}")
+                    print(f"Received content: {parser.content}")
 
             else:
                 response = await self.run_in_thread(
@@ -135,6 +155,8 @@ class SurveyConsumer(AsyncWebsocketConsumer):
                         {"type": "generation_complete", "survey": survey_data}
                     )
                 )
+        except (ExecutorSaturated, SchedulerSaturated):
+            await self.send_busy()
         except GenerationError as e:
             await self.send(
                 text_data=json.dumps(
@@ -168,7 +190,7 @@ class SurveyConsumer(AsyncWebsocketConsumer):
 
             survey_schema = SurveySchema.model_validate(survey_data)
 
-            generator = SurveyGenerator()
+            generator = self.get_generator()
             updated_survey = await self.run_in_thread(
                 generator.regenerate_question,
                 survey_schema=survey_schema,
@@ -186,6 +208,8 @@ class SurveyConsumer(AsyncWebsocketConsumer):
                 )
             )
 
+        except (ExecutorSaturated, SchedulerSaturated):
+            await self.send_busy()
         except GenerationError as e:
             await self.send(
                 text_data=json.dumps(
@@ -215,20 +239,27 @@ class SurveyConsumer(AsyncWebsocketConsumer):
         Returns:
             The saved survey object
         """
-        survey = Survey.objects.create(
-            title=survey_schema.title,
-            description=survey_schema.description or "",
-            prompt=prompt,
-        )
-
-        for i, q in enumerate(survey_schema.questions):
-            question = Question.objects.create(
-                survey=survey, text=q.text, type=q.type, required=q.required, order=i
+        # One transaction, so the cached schema of the survey is invalidated once
+        # and not after every question and option
+        with transaction.atomic():
+            survey = Survey.objects.create(
+                title=survey_schema.title,
+                description=survey_schema.description or "",
+                prompt=prompt,
             )
 
-            if q.options:
-                for j, opt in enumerate(q.options):
-                    Option.objects.create(question=question, text=opt.text, order=j)
+            for i, q in enumerate(survey_schema.questions):
+                question = Question.objects.create(
+                    survey=survey,
+                    text=q.text,
+                    type=q.type,
+                    required=q.required,
+                    order=i,
+                )
+
+                if q.options:
+                    for j, opt in enumerate(q.options):
+                        Option.objects.create(question=question, text=opt.text, order=j)
 
         return survey
 
@@ -255,6 +286,8 @@ class SurveyConsumer(AsyncWebsocketConsumer):
                 )
             )
 
+        except ExecutorSaturated:
+            await self.send_busy()
         except Exception as e:
             import traceback
 
@@ -265,8 +298,54 @@ class SurveyConsumer(AsyncWebsocketConsumer):
                 )
             )
 
+    async def send_queue_position(self, position):
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "queued",
+                    "position": position,
+                    "message": f"Waiting for a free worker, position {position} in queue.",
+                }
+            )
+        )
+
+    def notify_openai_queue(self, position, wait):
+        # Called by the OpenAI scheduler, possibly from an executor thread
+        self.loop.call_soon_threadsafe(
+            asyncio.ensure_future, self.send_openai_queue_position(position, wait)
+        )
+
+    async def send_openai_queue_position(self, position, wait):
+        message = f"Waiting for OpenAI capacity, position {position} in queue"
+        if wait >= 1:
+            message += f", about {round(wait)}s"
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "queued",
+                    "position": position,
+                    "estimated_wait": round(wait),
+                    "message": f"{message}.",
+                }
+            )
+        )
+
+    async def send_busy(self):
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "error",
+                    "message": "The server is busy. Please try again in a moment.",
+                }
+            )
+        )
+
     async def run_in_thread(self, func, *args, **kwargs):
-        with ThreadPoolExecutor() as pool:
-            return await asyncio.get_event_loop().run_in_executor(
-                pool, lambda: func(*args, **kwargs)
+        executor = get_blocking_executor()
+        try:
+            return await executor.run(
+                func, *args, on_queued=self.send_queue_position, **kwargs
             )
+        except ExecutorSaturated:
+            logger.warning("Blocking executor saturated: %s", executor.stats())
+            raise
@@ -0,0 +1,137 @@
+import random
+from typing import Dict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    F,
+    IntegerField,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Survey, SurveyResponseCounter
+
+
+def get_shard_count() -> int:
+    """Return the number of counter shards per survey."""
+    return max(1, getattr(settings, "RESPONSE_COUNTER_SHARDS", 16))
+
+
+def increment_response_count(survey_id: int, amount: int = 1) -> None:
+    """
+    Add to the live response count of a survey.
+
+    The increment goes to a random shard row, so concurrent submissions to the
+    same survey rarely wait on each other's row lock. Must run inside the
+    submission transaction.
+
+    Args:
+        survey_id: ID of the survey
+        amount: Number of responses added, negative for deletions
+    """
+    shard = random.randrange(get_shard_count())
+    counters = SurveyResponseCounter.objects.filter(survey_id=survey_id, shard=shard)
+
+    if counters.update(count=F("count") + amount):
+        return
+
+    SurveyResponseCounter.objects.bulk_create(
+        [SurveyResponseCounter(survey_id=survey_id, shard=shard)],
+        ignore_conflicts=True,
+    )
+    counters.update(count=F("count") + amount)
+
+
+def with_live_response_count(queryset: QuerySet) -> QuerySet:
+    """
+    Annotate surveys with live_response_count: the compacted count plus all shards.
+
+    The shards are summed in a correlated subquery rather than a join with GROUP
+    BY, so a paginated list only sums the counters of the surveys on the page.
+
+    Args:
+        queryset: Queryset of surveys
+
+    Returns:
+        The annotated queryset
+    """
+    pending = (
+        SurveyResponseCounter.objects.filter(survey=OuterRef("pk"))
+        .values("survey")
+        .annotate(total=Sum("count"))
+        .values("total")
+    )
+    return queryset.annotate(
+        live_response_count=F("response_count")
+        + Coalesce(Subquery(pending), Value(0), output_field=IntegerField())
+    )
+
+
+def get_live_response_count(survey: Survey) -> int:
+    """Return the compacted response count of a survey plus its pending shards."""
+    live_response_count = getattr(survey, "live_response_count", None)
+    if live_response_count is not None:
+        return live_response_count
+
+    pending = SurveyResponseCounter.objects.filter(survey=survey).aggregate(
+        total=Coalesce(Sum("count"), Value(0))
+    )["total"]
+    return survey.response_count + pending
+
+
+def compact_response_counters(survey: Survey) -> int:
+    """
+    Fold the counter shards of a survey into Survey.response_count.
+
+    The shard rows are locked while they are read and reset, so increments made
+    during compaction wait and are not lost.
+
+    Args:
+        survey: The survey to compact
+
+    Returns:
+        The number of responses moved into Survey.response_count
+    """
+    with transaction.atomic():
+        shards = list(
+            SurveyResponseCounter.objects.select_for_update()
+            .filter(survey=survey)
+            .exclude(count=0)
+            .values_list("id", "count")
+        )
+        if not shards:
+            return 0
+
+        total = sum(count for _, count in shards)
+        SurveyResponseCounter.objects.filter(
+            id__in=[counter_id for counter_id, _ in shards]
+        ).update(count=0)
+        Survey.objects.filter(id=survey.id).update(
+            response_count=F("response_count") + total
+        )
+    return total
+
+
+def compact_all_response_counters() -> Dict[str, int]:
+    """
+    Compact the counters of every survey with pending shard increments.
+
+    Returns:
+        Dictionary with the number of compacted surveys and moved responses
+    """
+    survey_ids = (
+        SurveyResponseCounter.objects.exclude(count=0)
+        .values_list("survey_id", flat=True)
+        .distinct()
+    )
+    surveys = 0
+    responses = 0
+    for survey in Survey.objects.filter(id__in=list(survey_ids)).iterator():
+        responses += compact_response_counters(survey)
+        surveys += 1
+    return {"surveys": surveys, "responses": responses}
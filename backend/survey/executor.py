@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the queue of a BlockingExecutor is full."""
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool for blocking work started from async code.
+
+    A fixed number of worker threads run the tasks. Tasks beyond that wait in a
+    queue of at most max_queue entries, and submissions beyond that are rejected
+    with ExecutorSaturated. Queue depth, active tasks and the time tasks wait
+    before starting are tracked for stats().
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        """
+        Initialize the executor.
+
+        Args:
+            workers: Number of worker threads
+            max_queue: Maximum number of tasks waiting for a worker
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="consumer-blocking"
+        )
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._active = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def submit(self, func: Callable, *args, **kwargs) -> Tuple[int, Future]:
+        """
+        Queue a blocking call.
+
+        Returns:
+            A tuple of (task id, future of the result)
+
+        Raises:
+            ExecutorSaturated: If max_queue tasks are already waiting
+        """
+        with self._lock:
+            if len(self._waiting) >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(
+                    f"{len(self._waiting)} tasks are already waiting for a worker"
+                )
+            task_id = next(self._ids)
+            self._waiting[task_id] = time.monotonic()
+            self._submitted += 1
+
+        future = self._pool.submit(self._run, task_id, func, args, kwargs)
+        return task_id, future
+
+    def queue_position(self, task_id: int) -> Optional[int]:
+        """
+        Return the 1-based position of a task in the queue.
+
+        Tasks that are about to be picked up by an idle worker are not counted
+        as queued.
+
+        Returns:
+            The position, or None once the task has started or a worker is free
+            for it
+        """
+        with self._lock:
+            if task_id not in self._waiting:
+                return None
+            ahead = sum(1 for waiting_id in self._waiting if waiting_id <= task_id)
+            position = ahead - (self.workers - self._active)
+            return position if position > 0 else None
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a blocking call on the pool and wait for its result.
+
+        Args:
+            func: The blocking callable
+            on_queued: Optional coroutine function called with the queue position
+                when the task has to wait for a worker, and again whenever the
+                position changes
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            The result of func
+
+        Raises:
+            ExecutorSaturated: If the queue is full
+        """
+        task_id, future = self.submit(func, *args, **kwargs)
+        result = asyncio.wrap_future(future)
+        if on_queued is None:
+            return await result
+
+        interval = settings.CONSUMER_EXECUTOR.get("POSITION_INTERVAL", 1.0)
+        reported = None
+        while True:
+            position = self.queue_position(task_id)
+            if position is None:
+                break
+            if position != reported:
+                reported = position
+                await on_queued(position)
+            done, _ = await asyncio.wait({result}, timeout=interval)
+            if done:
+                break
+        return await result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth, worker use and wait times."""
+        with self._lock:
+            started = self._submitted - len(self._waiting)
+            return {
+                "workers": self.workers,
+                "active": self._active,
+                "queued": len(self._waiting),
+                "max_queue": self.max_queue,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "avg_wait_seconds": self._total_wait / started if started else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+    def _run(self, task_id: int, func: Callable, args, kwargs) -> Any:
+        with self._lock:
+            waited = time.monotonic() - self._waiting.pop(task_id)
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._active += 1
+
+        # Worker threads are reused, so drop database connections that have
+        # gone stale between tasks, as database_sync_to_async does.
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+
+@lru_cache(maxsize=1)
+def get_blocking_executor() -> BlockingExecutor:
+    """
+    Get or create the process-wide executor for blocking consumer work.
+
+    Returns:
+        The executor, sized by settings.CONSUMER_EXECUTOR
+    """
+    config = settings.CONSUMER_EXECUTOR
+    return BlockingExecutor(
+        workers=config.get("WORKERS", 8), max_queue=config.get("MAX_QUEUE", 100)
+    )
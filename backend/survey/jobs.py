@@ -0,0 +1,317 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Set
+from uuid import UUID
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .models import ReportJob, Survey
+from .reports import generate_survey_report, get_report_cache, make_report_cache_key
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUSES = ["queued", "running"]
+
+STAGE_PROGRESS = {
+    "loading": 10,
+    "analyzing": 30,
+    "charting": 50,
+    "exporting": 80,
+}
+
+
+@lru_cache(maxsize=1)
+def get_report_executor() -> ThreadPoolExecutor:
+    """
+    Get or create the bounded worker pool that runs report jobs.
+
+    Returns:
+        The process-wide executor, sized by settings.REPORT_JOBS["WORKERS"]
+    """
+    return ThreadPoolExecutor(
+        max_workers=settings.REPORT_JOBS.get("WORKERS", 2),
+        thread_name_prefix="report-job",
+    )
+
+
+class JobHeartbeat:
+    """
+    Refreshes the heartbeat of the report jobs owned by this process.
+
+    Jobs are registered when they are handed to the worker pool and removed when
+    their worker finishes, so a job waiting in the queue or spending a long time
+    in one stage stays fresh. A background thread updates them all with one
+    query per interval. Jobs whose process is gone stop being refreshed and are
+    eventually failed by fail_stale_report_jobs().
+    """
+
+    def __init__(self, interval: float):
+        """
+        Initialize the heartbeat.
+
+        Args:
+            interval: Seconds between two heartbeat updates
+        """
+        self.interval = interval
+        self._job_ids: Set[UUID] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, job_id: UUID) -> None:
+        """Start refreshing the heartbeat of a job."""
+        with self._lock:
+            self._job_ids.add(job_id)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="report-job-heartbeat", daemon=True
+                )
+                self._thread.start()
+
+    def discard(self, job_id: UUID) -> None:
+        """Stop refreshing the heartbeat of a job."""
+        with self._lock:
+            self._job_ids.discard(job_id)
+
+    def beat(self) -> int:
+        """
+        Refresh the heartbeat of every registered job that is still pending.
+
+        Returns:
+            Number of updated jobs
+        """
+        with self._lock:
+            job_ids = list(self._job_ids)
+        if not job_ids:
+            return 0
+        return ReportJob.objects.filter(
+            id__in=job_ids, status__in=PENDING_STATUSES
+        ).update(heartbeat_at=timezone.now())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            close_old_connections()
+            try:
+                self.beat()
+            except Exception:
+                logger.exception("Failed to refresh the report job heartbeat")
+
+
+@lru_cache(maxsize=1)
+def get_job_heartbeat() -> JobHeartbeat:
+    """
+    Get or create the process-wide report job heartbeat.
+
+    Returns:
+        The heartbeat, refreshing every settings.REPORT_JOBS["HEARTBEAT_SECONDS"]
+    """
+    return JobHeartbeat(settings.REPORT_JOBS.get("HEARTBEAT_SECONDS", 60))
+
+
+def get_job_file_path(job_id: UUID) -> Path:
+    """Return the path where the PDF of a job is written."""
+    directory = Path(settings.REPORT_JOBS["DIR"])
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{job_id}.pdf"
+
+
+def purge_expired_report_jobs() -> int:
+    """
+    Delete finished jobs older than settings.REPORT_JOBS["TTL_SECONDS"] and their files.
+
+    Returns:
+        Number of deleted jobs
+    """
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.REPORT_JOBS.get("TTL_SECONDS", 3600)
+    )
+    expired = ReportJob.objects.filter(
+        status__in=["completed", "failed"], finished_at__lt=cutoff
+    )
+
+    for file_path in expired.exclude(file_path="").values_list("file_path", flat=True):
+        try:
+            os.unlink(file_path)
+        except FileNotFoundError:
+            pass
+
+    deleted, _ = expired.delete()
+    return deleted
+
+
+def get_stale_cutoff() -> datetime:
+    """Return the time before which a pending job's heartbeat is considered stale."""
+    return timezone.now() - timedelta(
+        seconds=settings.REPORT_JOBS.get("STALE_SECONDS", 900)
+    )
+
+
+def fail_stale_report_jobs() -> int:
+    """
+    Mark queued or running jobs without a recent heartbeat as failed.
+
+    Their worker is gone (for example the process restarted), so they would
+    otherwise stay pending forever.
+
+    Returns:
+        Number of jobs marked failed
+    """
+    cutoff = get_stale_cutoff()
+    return ReportJob.objects.filter(
+        status__in=PENDING_STATUSES, heartbeat_at__lt=cutoff
+    ).update(
+        status="failed",
+        error="The report job stopped responding.",
+        finished_at=timezone.now(),
+    )
+
+
+def _write_job_file(job_id: UUID, write: Callable[[BinaryIO], None]) -> str:
+    """Write the PDF of a job to its file through a callback and return the path."""
+    path = get_job_file_path(job_id)
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        with open(tmp_path, "wb") as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return str(path)
+
+
+def enqueue_report_job(
+    survey: Survey, last_response_id: Optional[int], response_count: int
+) -> ReportJob:
+    """
+    Create a report job for a survey and schedule it on the worker pool.
+
+    A job for the same survey and response watermark that is still pending and
+    has a recent heartbeat is reused, and a report already in the report cache
+    completes the job immediately.
+
+    Args:
+        survey: The survey to report on
+        last_response_id: Latest response id of the survey
+        response_count: Current number of responses of the survey
+
+    Returns:
+        The queued, running or completed job
+    """
+    purge_expired_report_jobs()
+    fail_stale_report_jobs()
+
+    cache_key = make_report_cache_key(survey, last_response_id, response_count)
+
+    pending = ReportJob.objects.filter(
+        survey=survey,
+        cache_key=cache_key,
+        status__in=PENDING_STATUSES,
+        heartbeat_at__gte=get_stale_cutoff(),
+    ).first()
+    if pending is not None:
+        return pending
+
+    job = ReportJob(survey=survey, cache_key=cache_key)
+
+    cached_report = get_report_cache().open(cache_key)
+    if cached_report is not None:
+        now = timezone.now()
+        with cached_report:
+            job.file_path = _write_job_file(
+                job.id, lambda job_file: shutil.copyfileobj(cached_report, job_file)
+            )
+        job.status = "completed"
+        job.progress = 100
+        job.started_at = now
+        job.finished_at = now
+        job.save()
+        return job
+
+    job.save()
+    transaction.on_commit(
+        lambda: submit_report_job(job.id, last_response_id, response_count)
+    )
+    return job
+
+
+def submit_report_job(
+    job_id: UUID, last_response_id: Optional[int], response_count: int
+) -> None:
+    """Hand a saved job to the worker pool and keep its heartbeat fresh meanwhile."""
+    get_job_heartbeat().add(job_id)
+    try:
+        get_report_executor().submit(
+            run_report_job, job_id, last_response_id, response_count
+        )
+    except BaseException:
+        get_job_heartbeat().discard(job_id)
+        raise
+
+
+def run_report_job(
+    job_id: UUID, last_response_id: Optional[int], response_count: int
+) -> None:
+    """
+    Generate the report of a job, write it to the job file and the report cache.
+
+    Runs on a worker thread, so it manages its own database connection. Status
+    changes only apply to a job in the expected status, so a job failed as stale
+    in the meantime is neither started nor marked completed.
+
+    Args:
+        job_id: ID of the job to run
+        last_response_id: Latest response id of the survey when the job was enqueued
+        response_count: Response count of the survey when the job was enqueued
+    """
+    close_old_connections()
+    try:
+        job = ReportJob.objects.select_related("survey").get(id=job_id)
+        now = timezone.now()
+        started = ReportJob.objects.filter(id=job_id, status="queued").update(
+            status="running", started_at=now, heartbeat_at=now
+        )
+        if not started:
+            return
+
+        def on_stage(stage):
+            ReportJob.objects.filter(id=job_id, status="running").update(
+                stage=stage, progress=STAGE_PROGRESS[stage], heartbeat_at=timezone.now()
+            )
+
+        file_path = _write_job_file(
+            job_id,
+            lambda job_file: generate_survey_report(
+                job.survey,
+                last_response_id,
+                response_count,
+                job_file,
+                on_stage=on_stage,
+            ),
+        )
+        with open(file_path, "rb") as job_file:
+            get_report_cache().put_file(job.cache_key, job_file)
+
+        ReportJob.objects.filter(id=job_id, status="running").update(
+            status="completed",
+            progress=100,
+            file_path=file_path,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("Report job %s failed", job_id)
+        ReportJob.objects.filter(id=job_id, status__in=PENDING_STATUSES).update(
+            status="failed", error=str(e), finished_at=timezone.now()
+        )
+    finally:
+        get_job_heartbeat().discard(job_id)
+        connections.close_all()
@@ -0,0 +1,152 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aggregates import load_survey_aggregates
+from .models import Answer, Response, Survey
+
+
+class ReportDataLoader:
+    """
+    Loads survey definition and responses in the format expected by ReportGenerator.
+
+    The number of queries is fixed regardless of how many responses the survey has:
+    questions, options, responses, answers and the answer/option through table are
+    each read once.
+    """
+
+    CHUNK_SIZE = 2000
+
+    def __init__(self, survey: Survey):
+        """
+        Initialize the loader.
+
+        Args:
+            survey: The survey to load report data for
+        """
+        self.survey = survey
+
+    def load(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Load the complete report payload.
+
+        Returns:
+            A tuple of (survey_data, responses_data)
+        """
+        return self.load_survey_data(), self.load_responses_data()
+
+    def load_survey_data(self) -> Dict[str, Any]:
+        """
+        Build the survey metadata and question schema.
+
+        Returns:
+            Dictionary with survey metadata and questions
+        """
+        survey = self.survey
+        questions = survey.questions.all().prefetch_related("options")
+
+        question_list = []
+        for q in questions:
+            question_list.append(
+                {
+                    "id": q.id,
+                    "text": q.text,
+                    "type": q.type,
+                    "required": q.required,
+                    "options": [
+                        {"id": option.id, "text": option.text, "order": option.order}
+                        for option in q.options.all()
+                    ],
+                }
+            )
+
+        return {
+            "id": survey.id,
+            "title": survey.title,
+            "description": survey.description or "",
+            "schema": {"questions": question_list},
+            "public_id": survey.public_id,
+            "created_at": survey.created_at.isoformat(),
+            "updated_at": survey.updated_at.isoformat() if survey.updated_at else None,
+        }
+
+    def load_aggregates(self, total_responses: int) -> Optional[Dict[str, Any]]:
+        """
+        Load the precomputed choice counts of the survey.
+
+        Args:
+            total_responses: Current number of responses of the survey
+
+        Returns:
+            Aggregates for SurveyAnalyzer, or None if they are incomplete
+        """
+        return load_survey_aggregates(self.survey, total_responses)
+
+    def load_responses_data(self, text_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build the list of responses with their answers.
+
+        Args:
+            text_only: Only load answers to text questions. Used when choice
+                questions are analyzed from aggregates.
+
+        Returns:
+            List of response dictionaries, each with its answers
+        """
+        selected_by_answer = {} if text_only else self._load_selected_options()
+
+        answers_by_response = defaultdict(list)
+        answers = Answer.objects.filter(survey_id=self.survey.id)
+        if text_only:
+            answers = answers.filter(question__type="text")
+        answers = (
+            answers.order_by("response_id", "id")
+            .values_list("id", "response_id", "question_id", "text_answer")
+        )
+        for answer_id, response_id, question_id, text_answer in answers.iterator(
+            chunk_size=self.CHUNK_SIZE
+        ):
+            answers_by_response[response_id].append(
+                {
+                    "id": answer_id,
+                    "question": question_id,
+                    "text_answer": text_answer or "",
+                    "selected_options": selected_by_answer.get(answer_id, []),
+                }
+            )
+
+        responses = (
+            Response.objects.filter(survey_id=self.survey.id)
+            .order_by("id")
+            .values_list(
+                "id", "survey_id", "created_at", "respondent_name", "respondent_email"
+            )
+        )
+
+        responses_data = []
+        for row in responses.iterator(chunk_size=self.CHUNK_SIZE):
+            response_id, survey_id, created_at, respondent_name, respondent_email = row
+            responses_data.append(
+                {
+                    "id": response_id,
+                    "survey_id": survey_id,
+                    "created_at": created_at.isoformat(),
+                    "respondent_name": respondent_name or "",
+                    "respondent_email": respondent_email or "",
+                    "answers": answers_by_response.get(response_id, []),
+                }
+            )
+        return responses_data
+
+    def _load_selected_options(self) -> Dict[int, List[int]]:
+        """Read the answer/option through table for the whole survey in one query."""
+        through = Answer.selected_options.through
+        rows = (
+            through.objects.filter(answer__survey_id=self.survey.id)
+            .order_by("answer_id", "option__order", "option_id")
+            .values_list("answer_id", "option_id")
+        )
+
+        selected_by_answer = defaultdict(list)
+        for answer_id, option_id in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            selected_by_answer[answer_id].append(option_id)
+        return selected_by_answer
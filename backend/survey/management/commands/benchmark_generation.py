@@ -0,0 +1,225 @@
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from openai_survey import SurveyGenerator
+from survey.consumers import SurveyConsumer
+
+
+class FakeCompletions:
+    """Streams a fixed survey in chunks, sleeping between them like a slow network."""
+
+    def __init__(self, chunks, chunk_delay):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        survey = {
+            "title": "Event loop lag benchmark",
+            "description": "Generated by the benchmark",
+            "questions": [
+                {
+                    "text": f"Question {i + 1}",
+                    "type": "radio",
+                    "required": True,
+                    "options": [{"text": f"Option {j + 1}"} for j in range(4)],
+                }
+                for i in range(10)
+            ],
+        }
+        content = json.dumps(survey)
+        size = max(1, len(content) // self.chunks + 1)
+        return self._stream(
+            [content[i : i + size] for i in range(0, len(content), size)]
+        )
+
+    async def _stream(self, pieces):
+        for piece in pieces:
+            await asyncio.sleep(self.chunk_delay)
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))]
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        "Run parallel streamed survey generations through SurveyConsumer. Reports "
+        "how late the event loop wakes up a ticker meanwhile, the WebSocket "
+        "frames, bytes and CPU time per generated survey and the number of "
+        "upstream calls. Fails when the worst lag exceeds --max-lag-ms. Uses a "
+        "simulated OpenAI stream unless --live is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sessions", type=int, default=20, help="Parallel WebSocket sessions"
+        )
+        parser.add_argument(
+            "--chunks", type=int, default=200, help="Chunks per simulated stream"
+        )
+        parser.add_argument(
+            "--chunk-delay",
+            type=float,
+            default=0.01,
+            help="Seconds between simulated chunks",
+        )
+        parser.add_argument(
+            "--max-lag-ms",
+            type=float,
+            default=50,
+            help="Fail if the event loop is ever this late",
+        )
+        parser.add_argument(
+            "--window-ms",
+            type=int,
+            help="Override settings.WEBSOCKET_SEND['WINDOW_MS']; 0 disables coalescing",
+        )
+        parser.add_argument(
+            "--same-prompt",
+            action="store_true",
+            help="Send the same prompt from every session, like a shared template",
+        )
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="Call the OpenAI API instead of a simulated stream",
+        )
+
+    def handle(self, *args, **options):
+        completions = None
+        if options["live"]:
+            consumer = SurveyConsumer
+        else:
+            completions = FakeCompletions(options["chunks"], options["chunk_delay"])
+            fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+            class SimulatedConsumer(SurveyConsumer):
+                def get_generator(self):
+                    return SurveyGenerator(
+                        model="simulated",
+                        client=fake_client,
+                        async_client=fake_client,
+                        owner=self.channel_name,
+                        on_queued=self.notify_openai_queue,
+                    )
+
+            consumer = SimulatedConsumer
+
+        send_config = dict(settings.WEBSOCKET_SEND)
+        if options["window_ms"] is not None:
+            send_config["WINDOW_MS"] = options["window_ms"]
+
+        cpu_start = time.process_time()
+        with override_settings(WEBSOCKET_SEND=send_config):
+            lags, timings = asyncio.run(
+                self._run(consumer, options["sessions"], options["same_prompt"])
+            )
+        cpu = time.process_time() - cpu_start
+
+        sessions = options["sessions"]
+        durations = [timing["duration"] for timing in timings]
+        first_questions = [
+            timing["first_question"]
+            for timing in timings
+            if timing["first_question"] is not None
+        ]
+        frames = sum(timing["frames"] for timing in timings)
+        received = sum(timing["bytes"] for timing in timings)
+
+        lags_ms = sorted(lag * 1000 for lag in lags)
+        worst = lags_ms[-1] if lags_ms else 0.0
+        p99 = lags_ms[int(len(lags_ms) * 0.99)] if lags_ms else 0.0
+        self.stdout.write(
+            f"{options['sessions']} sessions, "
+            f"median generation {statistics.median(durations):.2f}s, "
+            f"slowest {max(durations):.2f}s"
+        )
+        self.stdout.write(
+            f"Per survey with a {send_config['WINDOW_MS']}ms send window: "
+            f"{frames / sessions:.0f} frames, {received / sessions / 1024:.1f} KiB, "
+            f"{cpu / sessions * 1000:.1f}ms CPU"
+        )
+        if completions is not None:
+            self.stdout.write(
+                f"Upstream calls: {completions.calls} for {sessions} sessions"
+            )
+        if first_questions:
+            self.stdout.write(
+                f"Median time to first question {statistics.median(first_questions):.2f}s"
+            )
+        self.stdout.write(
+            f"Event loop lag over {len(lags_ms)} ticks: "
+            f"median {statistics.median(lags_ms):.1f}ms, p99 {p99:.1f}ms, "
+            f"max {worst:.1f}ms"
+        )
+
+        if worst > options["max_lag_ms"]:
+            raise CommandError(
+                f"Event loop lag {worst:.1f}ms exceeds {options['max_lag_ms']}ms."
+            )
+        self.stdout.write(self.style.SUCCESS("Event loop stayed responsive."))
+
+    async def _run(self, consumer, sessions, same_prompt):
+        interval = 0.005
+        lags = []
+        running = True
+
+        async def tick():
+            while running:
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                lags.append(time.perf_counter() - start - interval)
+
+        async def generate(index):
+            communicator = WebsocketCommunicator(
+                consumer.as_asgi(), "/ws/survey/generate/"
+            )
+            await communicator.connect()
+            await communicator.receive_json_from()
+            start = time.perf_counter()
+            prompt = "Benchmark survey" if same_prompt else f"Benchmark survey {index}"
+            await communicator.send_json_to(
+                {
+                    "type": "generate_survey",
+                    "prompt": prompt,
+                    "stream": True,
+                }
+            )
+            first_question = None
+            frames = 0
+            received = 0
+            while True:
+                frame = await communicator.receive_from(timeout=120)
+                frames += 1
+                received += len(frame.encode("utf-8"))
+                message = json.loads(frame)
+                if message["type"] == "question_ready" and first_question is None:
+                    first_question = time.perf_counter() - start
+                if message["type"] == "generation_complete":
+                    break
+                if message["type"] == "error":
+                    raise CommandError(f"Generation failed: {message['message']}")
+            await communicator.disconnect()
+            return {
+                "duration": time.perf_counter() - start,
+                "first_question": first_question,
+                "frames": frames,
+                "bytes": received,
+            }
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            timings = await asyncio.gather(*[generate(i) for i in range(sessions)])
+        finally:
+            running = False
+            await ticker
+        return lags, timings
@@ -0,0 +1,134 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from survey.aggregates import rebuild_survey_aggregates
+from survey.models import Option, Question, Survey
+from survey.partitions import delete_survey
+from survey.views import SurveyResponseCreateAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure response submissions per second through the submission endpoint. "
+        "Creates a temporary survey and deletes it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--submissions", type=int, default=500, help="Number of submissions"
+        )
+        parser.add_argument(
+            "--questions", type=int, default=10, help="Questions in the survey"
+        )
+        parser.add_argument(
+            "--threads", type=int, default=1, help="Concurrent submitting threads"
+        )
+
+    def handle(self, *args, **options):
+        survey = self._create_survey(options["questions"])
+        try:
+            questions = [
+                (
+                    question.id,
+                    question.type,
+                    [option.id for option in question.options.all()],
+                )
+                for question in survey.questions.prefetch_related("options")
+            ]
+            payloads = [
+                self._build_payload(questions) for _ in range(options["submissions"])
+            ]
+            view = SurveyResponseCreateAPIView.as_view()
+            factory = APIRequestFactory()
+
+            def submit(payload):
+                request = factory.post(
+                    f"/api/surveys/{survey.public_id}/respond/",
+                    json.dumps(payload),
+                    content_type="application/json",
+                )
+                response = view(request, public_id=survey.public_id)
+                if response.status_code != 201:
+                    raise RuntimeError(f"Submission failed: {response.data}")
+
+            def submit_all(chunk):
+                try:
+                    for payload in chunk:
+                        submit(payload)
+                finally:
+                    connections.close_all()
+
+            with CaptureQueriesContext(connection) as queries:
+                submit(payloads[0])
+            self.stdout.write(f"Queries per submission: {len(queries)}")
+
+            threads = options["threads"]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(
+                    executor.map(
+                        submit_all, [payloads[i::threads] for i in range(threads)]
+                    )
+                )
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(payloads)} submissions in {elapsed:.2f}s: "
+                    f"{len(payloads) / elapsed:.1f} submissions/s with {threads} thread(s)"
+                )
+            )
+        finally:
+            delete_survey(survey)
+
+    def _create_survey(self, question_count):
+        survey = Survey.objects.create(title="Submission benchmark", prompt="benchmark")
+        types = ["radio", "checkbox", "dropdown", "text"]
+        for order in range(question_count):
+            question = Question.objects.create(
+                survey=survey,
+                text=f"Question {order + 1}",
+                type=types[order % len(types)],
+                order=order,
+            )
+            if question.type != "text":
+                Option.objects.bulk_create(
+                    [
+                        Option(question=question, text=f"Option {i + 1}", order=i)
+                        for i in range(5)
+                    ]
+                )
+
+        # bulk_create skips the signal creating the option aggregate rows
+        rebuild_survey_aggregates(survey)
+        return survey
+
+    def _build_payload(self, questions):
+        answers = []
+        for question_id, question_type, option_ids in questions:
+            if question_type == "text":
+                answers.append(
+                    {"question": question_id, "text_answer": "Benchmark answer"}
+                )
+            elif question_type == "checkbox":
+                answers.append(
+                    {
+                        "question": question_id,
+                        "selected_options": random.sample(option_ids, 2),
+                    }
+                )
+            else:
+                answers.append(
+                    {
+                        "question": question_id,
+                        "selected_options": [random.choice(option_ids)],
+                    }
+                )
+        return {"respondent_name": "Benchmark", "answers": answers}
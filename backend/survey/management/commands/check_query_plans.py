@@ -0,0 +1,313 @@
+import json
+import random
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory
+
+from survey.aggregates import load_survey_aggregates, rebuild_survey_aggregates
+from survey.loaders import ReportDataLoader
+from survey.models import Answer, Option, Question, Response, Survey
+from survey.reports import get_response_watermark
+from survey.schema_cache import compile_survey_detail
+from survey.submissions import save_responses
+from survey.validation import get_validation_map
+from survey.views import SurveyListAPIView
+
+# Tables that grow with usage. A sequential scan on any other table is accepted.
+LARGE_TABLES = {
+    "survey_survey",
+    "survey_response",
+    "survey_answer",
+    "survey_answer_selected_options",
+}
+PARTITION_SUFFIX = re.compile(r"_p\d+$")
+# Seeded responses are spread over at least RESPONSE_SURVEYS surveys with about
+# RESPONSES_PER_SURVEY responses each
+RESPONSE_SURVEYS = 20
+RESPONSES_PER_SURVEY = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the queries issued by the views, report loader and "
+        "submission path, and fail if any of them sequentially scans a large "
+        "table. Use --seed to check against a generated dataset that is rolled "
+        "back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--survey",
+            help="Public ID of the survey to check. Defaults to the largest survey.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many responses (and surveys) before checking",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                survey = self._seed(options["seed"])
+            else:
+                survey = self._get_survey(options["survey"])
+
+            self.stdout.write(
+                f"Checking survey {survey.public_id} with "
+                f"{survey.responses.count()} of {Response.objects.count()} responses"
+            )
+            statements = self._capture_statements(survey)
+            failures = []
+            for label, sql in statements:
+                plan, seq_scans = self._explain(sql)
+                if seq_scans:
+                    failures.append((label, sql, plan, seq_scans))
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"FAIL {label}: sequential scan on {', '.join(seq_scans)}"
+                        )
+                    )
+                else:
+                    self.stdout.write(f"ok   {label}")
+
+            transaction.set_rollback(True)
+
+        if failures:
+            for label, sql, plan, _ in failures:
+                self.stderr.write(f"\n{label}\n{sql}\n{plan}")
+            raise CommandError(f"{len(failures)} queries use sequential scans.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"All {len(statements)} queries use index scans.")
+        )
+
+    def _get_survey(self, public_id):
+        surveys = Survey.objects.all()
+        if public_id:
+            survey = surveys.filter(public_id=public_id).first()
+        else:
+            largest = (
+                Response.objects.values("survey_id")
+                .annotate(total=Count("id"))
+                .order_by("-total")
+                .first()
+            )
+            survey = (
+                surveys.filter(id=largest["survey_id"]).first() if largest else None
+            )
+        if survey is None:
+            raise CommandError("No survey with responses found. Use --seed.")
+        return survey
+
+    def _seed(self, response_count):
+        """
+        Generate surveys with responses and return the one to check.
+
+        The responses are spread over many surveys, so every per-survey filter
+        selects only a small share of its table, as it does in production. With
+        a single survey holding every response, a sequential scan would be the
+        right plan and the check would prove nothing.
+        """
+        survey_count = max(RESPONSE_SURVEYS, response_count // RESPONSES_PER_SURVEY)
+        self.stdout.write(
+            f"Seeding {response_count} responses over {survey_count} surveys..."
+        )
+        Survey.objects.bulk_create(
+            [
+                Survey(
+                    title=f"Seeded survey {i}", prompt="seed", public_id=f"seed{i:04d}"
+                )
+                for i in range(max(1000, response_count // 10))
+            ]
+        )
+
+        surveys = [self._seed_survey(i) for i in range(survey_count)]
+        for index, survey in enumerate(surveys):
+            start = response_count * index // survey_count
+            end = response_count * (index + 1) // survey_count
+            self._seed_responses(survey, end - start)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for table in sorted(LARGE_TABLES):
+                    cursor.execute(f"ANALYZE {table}")
+        return surveys[survey_count // 2]
+
+    def _seed_survey(self, index):
+        survey = Survey.objects.create(
+            title=f"Query plan check {index + 1}", prompt="seed"
+        )
+        types = ["radio", "checkbox", "dropdown", "text"]
+        for order in range(10):
+            question = Question.objects.create(
+                survey=survey,
+                text=f"Question {order + 1}",
+                type=types[order % len(types)],
+                order=order,
+            )
+            if question.type != "text":
+                Option.objects.bulk_create(
+                    [
+                        Option(question=question, text=f"Option {i + 1}", order=i)
+                        for i in range(5)
+                    ]
+                )
+
+        # bulk_create skips the signal creating the option aggregate rows
+        rebuild_survey_aggregates(survey)
+        return survey
+
+    def _seed_responses(self, survey, response_count):
+        validation_map = get_validation_map(survey)
+        questions = [
+            (question_id, sorted(rule.option_ids))
+            for question_id, rule in validation_map.rules.items()
+        ]
+        for start in range(0, response_count, 1000):
+            submissions = [
+                (
+                    {},
+                    [
+                        (
+                            question_id,
+                            None if option_ids else "seeded answer",
+                            random.sample(option_ids, 1) if option_ids else [],
+                        )
+                        for question_id, option_ids in questions
+                    ],
+                )
+                for _ in range(min(1000, response_count - start))
+            ]
+            save_responses(survey, submissions, validation_map.question_ids)
+
+    def _capture_statements(self, survey):
+        """Run the hot code paths and collect the SELECT statements they issue."""
+        question = survey.questions.first()
+        option = Option.objects.filter(question__survey=survey).first()
+        list_view = SurveyListAPIView.as_view()
+        factory = APIRequestFactory()
+        created_at = survey.created_at.date().isoformat()
+
+        paths = [
+            ("survey list", lambda: list_view(factory.get("/api/surveys/"))),
+            (
+                "survey list by title prefix",
+                lambda: list_view(factory.get("/api/surveys/", {"title_prefix": "Q"})),
+            ),
+            (
+                "survey list by date range",
+                lambda: list_view(
+                    factory.get("/api/surveys/", {"created_after": created_at})
+                ),
+            ),
+            ("survey detail schema", lambda: compile_survey_detail(survey.public_id)),
+            ("response watermark", lambda: get_response_watermark(survey)),
+            ("report loader", lambda: ReportDataLoader(survey).load()),
+            (
+                "report loader text answers",
+                lambda: ReportDataLoader(survey).load_responses_data(text_only=True),
+            ),
+            (
+                "report aggregates",
+                lambda: load_survey_aggregates(survey, survey.responses.count()),
+            ),
+            (
+                "responses by survey and date",
+                lambda: list(
+                    Response.objects.filter(survey=survey)
+                    .order_by("-created_at")
+                    .values_list("id", flat=True)[:50]
+                ),
+            ),
+        ]
+        if question is not None:
+            paths.append(
+                (
+                    "answers by question",
+                    lambda: list(
+                        Answer.objects.filter(question=question).values_list(
+                            "response_id", flat=True
+                        )[:50]
+                    ),
+                )
+            )
+        if option is not None:
+            through = Answer.selected_options.through
+            paths.append(
+                (
+                    "answers by selected option",
+                    lambda: list(
+                        through.objects.filter(option=option).values_list(
+                            "answer_id", flat=True
+                        )[:50]
+                    ),
+                )
+            )
+
+        statements = []
+        # The request factory sends Host: testserver, which ALLOWED_HOSTS rejects
+        # outside the test runner
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        for label, run in paths:
+            with override_settings(ALLOWED_HOSTS=hosts):
+                with CaptureQueriesContext(connection) as queries:
+                    run()
+            selects = [
+                query["sql"]
+                for query in queries.captured_queries
+                if query["sql"].lstrip().upper().startswith("SELECT")
+            ]
+            for i, sql in enumerate(selects, start=1):
+                suffix = f" #{i}" if len(selects) > 1 else ""
+                statements.append((f"{label}{suffix}", sql))
+        return statements
+
+    def _explain(self, sql):
+        """
+        Explain a statement.
+
+        Returns:
+            A tuple of (plan text, large tables read with a sequential scan)
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                seq_scans = self._postgres_seq_scans(plan[0]["Plan"])
+                return json.dumps(plan, indent=2), seq_scans
+
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                details = [row[-1] for row in cursor.fetchall()]
+                return "\n".join(details), self._sqlite_seq_scans(details)
+
+        raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+    def _postgres_seq_scans(self, node):
+        seq_scans = set()
+        # Partitions created by partition_response_tables are named <table>_p<n>
+        relation = PARTITION_SUFFIX.sub("", node.get("Relation Name", ""))
+        if node.get("Node Type") == "Seq Scan" and relation in LARGE_TABLES:
+            seq_scans.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            seq_scans |= self._postgres_seq_scans(child)
+        return seq_scans
+
+    def _sqlite_seq_scans(self, details):
+        seq_scans = set()
+        for detail in details:
+            words = detail.replace("TABLE ", "").split()
+            if len(words) < 2 or words[0] != "SCAN" or "USING" in words:
+                continue
+            if words[1] in LARGE_TABLES:
+                seq_scans.add(words[1])
+        return seq_scans
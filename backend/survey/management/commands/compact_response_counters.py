@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from survey.counters import compact_all_response_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold sharded response counter rows into Survey.response_count. "
+        "Run it periodically, e.g. from cron, to keep the shard rows small."
+    )
+
+    def handle(self, *args, **options):
+        compacted = compact_all_response_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {compacted['responses']} responses "
+                f"across {compacted['surveys']} surveys."
+            )
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from survey.partitions import PARTITIONED_MODELS, build_partition_sql, is_partitioned
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the response and answer tables to PostgreSQL tables hash "
+        "partitioned by survey and move the existing rows into them. Runs in one "
+        "transaction that locks both tables, so schedule it during a maintenance "
+        "window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=16,
+            help="Number of hash partitions per table",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the SQL without running it",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning is only supported on PostgreSQL.")
+        if options["partitions"] < 1:
+            raise CommandError("--partitions must be at least 1.")
+
+        tables = [model._meta.db_table for model in PARTITIONED_MODELS]
+        pending = [table for table in tables if not is_partitioned(table)]
+        if not pending:
+            self.stdout.write("Tables are already partitioned.")
+            return
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "LOCK TABLE {} IN ACCESS EXCLUSIVE MODE".format(
+                        ", ".join(f'"{table}"' for table in pending)
+                    )
+                )
+                for table in pending:
+                    statements = build_partition_sql(table, options["partitions"])
+                    self.stdout.write(
+                        f"{table}: {options['partitions']} partitions by survey_id"
+                    )
+                    for sql in statements:
+                        if options["dry_run"]:
+                            self.stdout.write(f"{sql};")
+                        else:
+                            cursor.execute(sql)
+
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+                return
+
+        self.stdout.write(self.style.SUCCESS(f"Partitioned {', '.join(pending)}."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from survey.aggregates import rebuild_survey_aggregates
+from survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per-question answer counters and per-option counts from raw "
+        "answers. Use it to backfill existing surveys or repair drifted counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "public_ids",
+            nargs="*",
+            help="Public IDs of the surveys to rebuild. Rebuilds all surveys if omitted.",
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all().order_by("id")
+        if options["public_ids"]:
+            surveys = surveys.filter(public_id__in=options["public_ids"])
+            missing = set(options["public_ids"]) - set(
+                surveys.values_list("public_id", flat=True)
+            )
+            if missing:
+                raise CommandError(f"Surveys not found: {', '.join(sorted(missing))}")
+
+        for survey in surveys.iterator():
+            written = rebuild_survey_aggregates(survey)
+            self.stdout.write(
+                f"Rebuilt aggregates for '{survey.title}' ({survey.public_id}): "
+                f"{written['questions']} questions, {written['options']} options"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Aggregates rebuilt."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_response_count(apps, schema_editor):
+    Survey = apps.get_model("survey", "Survey")
+    for survey in Survey.objects.annotate(total=Count("responses")).iterator():
+        if survey.response_count != survey.total:
+            Survey.objects.filter(id=survey.id).update(response_count=survey.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0004_report_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SurveyResponseCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "survey",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="response_counters",
+                        to="survey.survey",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("survey", "shard"), name="unique_survey_counter_shard"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_response_count, migrations.RunPython.noop),
+    ]
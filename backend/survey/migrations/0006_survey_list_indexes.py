@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0005_response_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="survey_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["title"],
+                name="survey_title_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
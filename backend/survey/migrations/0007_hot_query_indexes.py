@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0006_survey_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["response", "question"], name="answer_response_question_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["question", "response"], name="answer_question_response_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="response",
+            index=models.Index(
+                fields=["survey", "created_at"], name="response_survey_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="response",
+            index=models.Index(fields=["survey", "id"], name="response_survey_id_idx"),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX answer_options_option_answer_idx "
+            "ON survey_answer_selected_options (option_id, answer_id)",
+            "DROP INDEX answer_options_option_answer_idx",
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_answer_survey(apps, schema_editor):
+    Answer = apps.get_model("survey", "Answer")
+    Response = apps.get_model("survey", "Response")
+    Answer.objects.filter(survey__isnull=True).update(
+        survey_id=Subquery(
+            Response.objects.filter(id=OuterRef("response_id")).values("survey_id")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0007_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="answers",
+                to="survey.survey",
+            ),
+        ),
+        migrations.RunPython(backfill_answer_survey, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="answer",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="answers",
+                to="survey.survey",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["survey", "response"], name="answer_survey_response_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+def create_missing_option_aggregates(apps, schema_editor):
+    # Option rows used to be created on the first selection. Submissions now only
+    # update existing rows, so surveys whose aggregates are complete need a row
+    # for every option.
+    Option = apps.get_model("survey", "Option")
+    OptionAggregate = apps.get_model("survey", "OptionAggregate")
+    options = Option.objects.filter(
+        question__aggregate__isnull=False, aggregate__isnull=True
+    ).values_list("id", "question_id", "question__survey_id")
+    OptionAggregate.objects.bulk_create(
+        [
+            OptionAggregate(
+                survey_id=survey_id, question_id=question_id, option_id=option_id
+            )
+            for option_id, question_id, survey_id in options.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0008_answer_survey"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="questionaggregate",
+            name="skipped_count",
+        ),
+        migrations.RunPython(
+            create_missing_option_aggregates, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0009_aggregate_rows_per_option"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("survey", "0010_reportjob_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="answer",
+            name="question",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="survey.question",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="answer",
+            name="response",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="answers",
+                to="survey.response",
+            ),
+        ),
+    ]
@@ -1,4 +1,7 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 
 
 class Survey(models.Model):
@@ -10,6 +13,18 @@ class Survey(models.Model):
     response_count = models.PositiveIntegerField(default=0, editable=False)
     public_id = models.CharField(max_length=16, unique=True, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"], name="survey_created_at_id_idx"
+            ),
+            models.Index(
+                fields=["title"],
+                name="survey_title_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -69,17 +84,126 @@ class Response(models.Model):
     respondent_name = models.CharField(max_length=100, blank=True, null=True)
     respondent_email = models.EmailField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["survey", "created_at"], name="response_survey_created_idx"
+            ),
+            models.Index(fields=["survey", "id"], name="response_survey_id_idx"),
+        ]
+
     def __str__(self):
         return f"Response {self.id} for {self.survey.title}"
 
 
 class Answer(models.Model):
+    # Copy of response.survey, so answers can be filtered and partitioned by survey
+    # without joining responses
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="answers", db_index=False
+    )
+    # The composite indexes below lead with response and question, so they also
+    # serve the foreign key lookups
     response = models.ForeignKey(
-        Response, on_delete=models.CASCADE, related_name="answers"
+        Response, on_delete=models.CASCADE, related_name="answers", db_index=False
     )
-    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, db_index=False)
     text_answer = models.TextField(blank=True, null=True)
     selected_options = models.ManyToManyField(Option, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["response", "question"], name="answer_response_question_idx"
+            ),
+            models.Index(
+                fields=["question", "response"], name="answer_question_response_idx"
+            ),
+            models.Index(
+                fields=["survey", "response"], name="answer_survey_response_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Response for {self.question.text}"
+
+
+class QuestionAggregate(models.Model):
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="question_aggregates"
+    )
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, related_name="aggregate"
+    )
+    answered_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Aggregate for {self.question_id}: {self.answered_count} answered"
+
+
+class OptionAggregate(models.Model):
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="option_aggregates"
+    )
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="option_aggregates"
+    )
+    option = models.OneToOneField(
+        Option, on_delete=models.CASCADE, related_name="aggregate"
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Aggregate for option {self.option_id}: {self.count}"
+
+
+class SurveyResponseCounter(models.Model):
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="response_counters"
+    )
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["survey", "shard"], name="unique_survey_counter_shard"
+            )
+        ]
+
+    def __str__(self):
+        return f"Counter shard {self.shard} for {self.survey_id}: {self.count}"
+
+
+class ReportJob(models.Model):
+    STATUSES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+    STAGES = [
+        ("loading", "Loading"),
+        ("analyzing", "Analyzing"),
+        ("charting", "Charting"),
+        ("exporting", "Exporting"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="report_jobs"
+    )
+    status = models.CharField(max_length=20, choices=STATUSES, default="queued")
+    stage = models.CharField(max_length=20, choices=STAGES, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    cache_key = models.CharField(max_length=200)
+    file_path = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Refreshed by the worker as the job advances
+    heartbeat_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Report job {self.id} for {self.survey_id} ({self.status})"
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class SurveyCursorPagination(CursorPagination):
+    """
+    Keyset pagination over surveys, newest first.
+
+    Pages are located by the created_at of the last row instead of an OFFSET, so
+    fetching any page costs the same index range scan on (created_at, id).
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
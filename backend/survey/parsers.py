@@ -0,0 +1,34 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a lazy iterator of objects.
+
+    Lines are decoded as they are read from the request stream, so large uploads
+    are never held in memory as a whole. A line that is not valid JSON is yielded
+    as a ParseError instead of aborting the stream, so the lines around it can
+    still be processed.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        return self._iter_lines(stream, encoding)
+
+    @staticmethod
+    def _iter_lines(stream, encoding):
+        if stream is None:
+            return
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line.decode(encoding))
+            except (UnicodeDecodeError, ValueError) as e:
+                yield ParseError(f"NDJSON parse error on line {line_number}: {e}")
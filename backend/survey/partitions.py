@@ -0,0 +1,142 @@
+from typing import List
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Answer, Response, Survey
+from .reports import get_report_cache
+
+# Tables hash partitioned by survey_id, in the order they are converted
+PARTITIONED_MODELS = (Response, Answer)
+
+
+def is_partitioned(table: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Check whether a table is a PostgreSQL partitioned table.
+
+    Args:
+        table: Name of the table
+        using: Database alias
+
+    Returns:
+        True if the table is partitioned, False otherwise or on other databases
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s))",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+
+def build_partition_sql(
+    table: str, partitions: int, using: str = DEFAULT_DB_ALIAS
+) -> List[str]:
+    """
+    Build the statements converting a table to one hash partitioned by survey_id.
+
+    The existing table is renamed, its rows are copied into the new partitioned
+    table and it is dropped. Indexes and foreign keys to other tables are
+    recreated on the new table. PostgreSQL requires the primary key of a
+    partitioned table to contain the partition key, so the primary key becomes
+    (id, survey_id) and foreign keys pointing at the table are dropped. Django
+    still cascades deletes of those relations itself.
+
+    Args:
+        table: Name of the table to convert. It must have id and survey_id columns.
+        partitions: Number of hash partitions
+        using: Database alias
+
+    Returns:
+        The SQL statements, to be run in one transaction
+    """
+    old_table = f"{table}_unpartitioned"
+    partitioned = [model._meta.db_table for model in PARTITIONED_MODELS]
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = %s::regclass AND NOT indisprimary",
+            [table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f' "
+            "AND confrelid::regclass::text <> ALL(%s)",
+            [table, partitioned],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        referencing = cursor.fetchall()
+
+    statements = [
+        f'ALTER TABLE "{referencing_table}" DROP CONSTRAINT "{name}"'
+        for referencing_table, name in referencing
+    ]
+    statements += [
+        f'ALTER TABLE "{table}" RENAME TO "{old_table}"',
+        f'CREATE TABLE "{table}" (LIKE "{old_table}" INCLUDING DEFAULTS) '
+        f"PARTITION BY HASH (survey_id)",
+    ]
+    statements += [
+        f'CREATE TABLE "{table}_p{remainder}" PARTITION OF "{table}" '
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+    statements += [
+        f'INSERT INTO "{table}" SELECT * FROM "{old_table}"',
+        f'DROP TABLE "{old_table}" CASCADE',
+        f'CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}".id',
+        f"SELECT setval('\"{table}_id_seq\"', "
+        f'COALESCE((SELECT MAX(id) FROM "{table}"), 0) + 1, false)',
+        f'ALTER TABLE "{table}" ALTER COLUMN id SET DEFAULT nextval(\'"{table}_id_seq"\')',
+        f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, survey_id)',
+    ]
+    statements += indexes
+    statements += [
+        f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}'
+        for name, definition in foreign_keys
+    ]
+    statements.append(f'ANALYZE "{table}"')
+    return statements
+
+
+def delete_survey(survey: Survey) -> None:
+    """
+    Delete a survey with its responses and answers.
+
+    Responses, answers and selected options are deleted with statements filtered
+    by survey_id, so on partitioned tables only the survey's partition is
+    touched. Django's cascade would otherwise load every response and delete
+    them by id, which reads all partitions.
+
+    Args:
+        survey: The survey to delete
+    """
+    through = Answer.selected_options.through
+    connection = connections[DEFAULT_DB_ALIAS]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {through._meta.db_table} WHERE answer_id IN "
+                f"(SELECT id FROM {Answer._meta.db_table} WHERE survey_id = %s)",
+                [survey.id],
+            )
+            cursor.execute(
+                f"DELETE FROM {Answer._meta.db_table} WHERE survey_id = %s",
+                [survey.id],
+            )
+            cursor.execute(
+                f"DELETE FROM {Response._meta.db_table} WHERE survey_id = %s",
+                [survey.id],
+            )
+        survey_id = survey.id
+        survey.delete()
+        transaction.on_commit(lambda: get_report_cache().invalidate(survey_id))
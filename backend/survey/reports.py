@@ -0,0 +1,200 @@
+import logging
+import tempfile
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Max
+
+from core.db_routers import use_primary, use_replica
+from survey_analytics.cache import ChartCache, ReportCache
+from survey_analytics.report import ReportGenerator
+from .loaders import ReportDataLoader
+from .models import Response, Survey
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_report_cache() -> ReportCache:
+    """
+    Get or create the process-wide report cache configured in settings.REPORT_CACHE.
+
+    Returns:
+        The report cache instance
+    """
+    config = getattr(settings, "REPORT_CACHE", {})
+    return ReportCache(
+        directory=config.get("DIR"),
+        memory_max_bytes=config.get("MEMORY_MAX_BYTES", 64 * 1024 * 1024),
+        disk_max_bytes=config.get("DISK_MAX_BYTES", 1024 * 1024 * 1024),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_chart_cache() -> ChartCache:
+    """
+    Get or create the process-wide chart image cache configured in settings.CHART_CACHE.
+
+    Returns:
+        The chart cache instance
+    """
+    config = getattr(settings, "CHART_CACHE", {})
+    return ChartCache(
+        memory_max_bytes=config.get("MEMORY_MAX_BYTES", 32 * 1024 * 1024),
+        directory=config.get("DIR"),
+        disk_max_bytes=config.get("DISK_MAX_BYTES", 256 * 1024 * 1024),
+    )
+
+
+def get_response_watermark(survey: Survey) -> Tuple[Optional[int], int]:
+    """
+    Get the latest response id and the response count of a survey in one query.
+
+    Returns:
+        A tuple of (last_response_id, response_count)
+    """
+    watermark = Response.objects.filter(survey=survey).aggregate(
+        last_id=Max("id"), count=Count("id")
+    )
+    return watermark["last_id"], watermark["count"]
+
+
+def _load_report_data(survey: Survey, response_count: int):
+    loader = ReportDataLoader(survey)
+    aggregates = loader.load_aggregates(response_count)
+    survey_data = loader.load_survey_data()
+    responses_data = loader.load_responses_data(text_only=aggregates is not None)
+    return survey_data, responses_data, aggregates
+
+
+def load_report_data(
+    survey: Survey, last_response_id: Optional[int], response_count: int
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Load the data of a report, from the read replica when it has caught up.
+
+    The replica is only used when its response watermark matches the one the
+    report is generated for, so a lagging replica never produces a report that
+    is cached under a newer watermark.
+
+    Returns:
+        A tuple of (survey_data, responses_data, aggregates)
+    """
+    with use_replica() as alias:
+        if alias != DEFAULT_DB_ALIAS and get_response_watermark(survey) != (
+            last_response_id,
+            response_count,
+        ):
+            logger.debug("Replica is behind for survey %s, using primary", survey.id)
+            with use_primary():
+                return _load_report_data(survey, response_count)
+        return _load_report_data(survey, response_count)
+
+
+def generate_survey_report(
+    survey: Survey,
+    last_response_id: Optional[int],
+    response_count: int,
+    target: BinaryIO,
+    include_visualizations: bool = True,
+    on_stage: Optional[Callable[[str], None]] = None,
+) -> None:
+    """
+    Load survey data and render the PDF report into a file.
+
+    Args:
+        survey: The survey to report on
+        last_response_id: Latest response id of the survey
+        response_count: Current number of responses of the survey
+        target: Writable binary file the PDF is written to
+        include_visualizations: Whether to include charts
+        on_stage: Optional callback called with the name of each stage as it starts
+            ("loading", "analyzing", "charting", "exporting")
+    """
+    on_stage = on_stage or (lambda stage: None)
+
+    on_stage("loading")
+    survey_data, responses_data, aggregates = load_report_data(
+        survey, last_response_id, response_count
+    )
+
+    on_stage("analyzing")
+    generator = ReportGenerator(
+        survey_data,
+        responses_data,
+        aggregates,
+        chart_workers=getattr(settings, "REPORT_CHART_WORKERS", 0),
+        chart_cache=get_chart_cache(),
+    )
+    generator.generate_analysis()
+
+    if include_visualizations:
+        on_stage("charting")
+        generator.add_visualizations()
+        logger.debug("Chart cache: %s", get_chart_cache().stats())
+
+    on_stage("exporting")
+    generator.export_report(
+        include_visualizations=include_visualizations, target=target
+    )
+
+
+def make_report_cache_key(
+    survey: Survey,
+    last_response_id: Optional[int],
+    response_count: int,
+    include_visualizations: bool = True,
+) -> str:
+    """Build the report cache key for a survey at a given response watermark."""
+    return get_report_cache().make_key(
+        survey.id,
+        last_response_id,
+        response_count,
+        {"include_visualizations": include_visualizations},
+    )
+
+
+def open_survey_report(
+    survey: Survey,
+    last_response_id: Optional[int],
+    response_count: int,
+    include_visualizations: bool = True,
+) -> BinaryIO:
+    """
+    Open the PDF report of a survey for reading, serving it from the report cache
+    when the survey has not received new responses since it was last generated.
+
+    New reports are written to a spooled temporary file, which only moves to disk
+    above settings.REPORT_SPOOL_MAX_BYTES, so the document is never copied as a
+    whole in memory.
+
+    Args:
+        survey: The survey to report on
+        last_response_id: Latest response id, from get_response_watermark()
+        response_count: Number of responses, from get_response_watermark()
+        include_visualizations: Whether to include charts
+
+    Returns:
+        A readable binary file positioned at the start of the PDF
+    """
+    cache = get_report_cache()
+    key = make_report_cache_key(
+        survey, last_response_id, response_count, include_visualizations
+    )
+
+    report_file = cache.open(key)
+    if report_file is None:
+        report_file = tempfile.SpooledTemporaryFile(
+            max_size=getattr(settings, "REPORT_SPOOL_MAX_BYTES", 8 * 1024 * 1024)
+        )
+        generate_survey_report(
+            survey,
+            last_response_id,
+            response_count,
+            report_file,
+            include_visualizations,
+        )
+        cache.put_file(key, report_file)
+    return report_file
@@ -0,0 +1,76 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.db_routers import use_primary
+from .models import Survey
+
+CACHE_KEY_PREFIX = "survey-schema"
+
+
+def get_cache_key(public_id: str) -> str:
+    """Return the cache key of the compiled detail payload of a survey."""
+    return f"{CACHE_KEY_PREFIX}:{public_id}"
+
+
+def compile_survey_detail(public_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the detail payload of a survey with its question/option schema.
+
+    Args:
+        public_id: Public ID of the survey
+
+    Returns:
+        Dictionary with the serialized "data", its "etag" and the "last_modified"
+        compile time, or None if the survey does not exist
+    """
+    from .serializers import SurveyDetailSerializer
+
+    # The payload is cached until the survey changes, so it is always built from
+    # the primary. A lagging replica would otherwise keep serving a stale schema.
+    with use_primary():
+        survey = (
+            Survey.objects.prefetch_related("questions__options")
+            .filter(public_id=public_id)
+            .first()
+        )
+        if survey is None:
+            return None
+
+        data = SurveyDetailSerializer(survey).data
+    body = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return {
+        "data": data,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "last_modified": timezone.now().replace(microsecond=0),
+    }
+
+
+def get_survey_detail(public_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the compiled detail payload of a survey, compiling it on a cache miss.
+
+    Args:
+        public_id: Public ID of the survey
+
+    Returns:
+        The payload from compile_survey_detail(), or None if the survey does not exist
+    """
+    key = get_cache_key(public_id)
+    payload = cache.get(key)
+    if payload is None:
+        payload = compile_survey_detail(public_id)
+        if payload is not None:
+            cache.set(
+                key, payload, getattr(settings, "SURVEY_SCHEMA_CACHE_TIMEOUT", 3600)
+            )
+    return payload
+
+
+def invalidate_survey_detail(public_id: str) -> None:
+    """Drop the compiled payload of a survey."""
+    cache.delete(get_cache_key(public_id))
@@ -1,12 +1,29 @@
+from django.db.models import prefetch_related_objects
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Survey, Response, Answer, Option, Question
+
+from .counters import get_live_response_count
+from .models import Survey, Response, Answer, Option, ReportJob
+from .submissions import save_responses
+from .validation import get_validation_map
 
 
 class SurveyListSerializer(serializers.ModelSerializer):
+    description = serializers.SerializerMethodField()
+    response_count = serializers.SerializerMethodField()
+
     class Meta:
         model = Survey
         fields = ['id', 'title', 'description', 'created_at', 'public_id', 'response_count']
 
+    def get_description(self, obj):
+        if hasattr(obj, 'description_preview'):
+            return obj.description_preview
+        return obj.description
+
+    def get_response_count(self, obj):
+        return get_live_response_count(obj)
+
 
 class SurveyDetailSerializer(serializers.ModelSerializer):
     schema = serializers.SerializerMethodField()
@@ -20,8 +37,7 @@ class SurveyDetailSerializer(serializers.ModelSerializer):
             'questions': []
         }
         
-        questions = obj.questions.all().prefetch_related('options')
-        for question in questions:
+        for question in obj.questions.all():
             question_data = {
                 'id': question.id,
                 'text': question.text,
@@ -58,7 +74,7 @@ class AnswerReadSerializer(serializers.ModelSerializer):
 
 
 class AnswerCreateSerializer(serializers.ModelSerializer):
-    question = serializers.PrimaryKeyRelatedField(queryset=Question.objects.all())
+    question = serializers.IntegerField()
     selected_options = serializers.ListField(
         child=serializers.IntegerField(),
         required=False,
@@ -80,29 +96,31 @@ class ResponseSerializer(serializers.ModelSerializer):
         model = Response
         fields = ['id', 'respondent_name', 'respondent_email', 'answers', 'answer_details']
         read_only_fields = ['id', 'answer_details']
+
+    def _answer_rows(self, answers_data):
+        return [
+            (answer['question'], answer.get('text_answer'), answer.get('selected_options', []))
+            for answer in answers_data
+        ]
+
+    def validate(self, attrs):
+        self.validation_map = get_validation_map(self.context['survey'])
+
+        errors = self.validation_map.validate(self._answer_rows(attrs.get('answers', [])))
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
     
     def create(self, validated_data):
         answers_data = validated_data.pop('answers', [])
-        response = Response.objects.create(**validated_data)
-        
-        for answer_data in answers_data:
-            question = answer_data.pop('question')
-            text_answer = answer_data.pop('text_answer', None)
-            selected_options = answer_data.pop('selected_options', [])
-            
-            answer = Answer.objects.create(
-                response=response,
-                question=question,
-                text_answer=text_answer
-            )
-
-            if selected_options:
-                for option_id in selected_options:
-                    try:
-                        option = Option.objects.get(id=option_id)
-                        answer.selected_options.add(option)
-                    except Option.DoesNotExist:
-                        print(f"Opcja o ID {option_id} nie istnieje")
+        survey = validated_data.pop('survey')
+
+        response, = save_responses(
+            survey,
+            [(validated_data, self._answer_rows(answers_data))],
+            self.validation_map.question_ids
+        )
+        prefetch_related_objects([response], 'answers__selected_options')
         
         return response
         
@@ -126,4 +144,29 @@ class SurveySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'public_id', 'created_at']
     
     def get_response_count(self, obj):
-        return obj.responses.count() 
\ No newline at end of file
+        return get_live_response_count(obj)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    status_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'status', 'stage', 'progress', 'error',
+            'created_at', 'started_at', 'finished_at', 'status_url', 'download_url'
+        ]
+
+    def _build_url(self, obj, name):
+        url = reverse(name, kwargs={'public_id': obj.survey.public_id, 'job_id': obj.id})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_status_url(self, obj):
+        return self._build_url(obj, 'survey-report-job')
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        return self._build_url(obj, 'survey-report-job-download')
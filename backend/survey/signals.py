@@ -0,0 +1,154 @@
+import weakref
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .aggregates import remove_response_aggregates
+from .counters import increment_response_count
+from .models import (
+    Option,
+    OptionAggregate,
+    Question,
+    QuestionAggregate,
+    Response,
+    Survey,
+)
+from .reports import get_report_cache
+from .schema_cache import invalidate_survey_detail
+
+
+@receiver(post_save, sender=Response)
+@receiver(post_delete, sender=Response)
+def invalidate_survey_reports(sender, instance, **kwargs):
+    get_report_cache().invalidate(instance.survey_id)
+
+
+def is_deletion_of(origin, model):
+    """Whether a delete() of the model itself, and not a cascade, sent the signal."""
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+def is_response_deletion(origin):
+    # Responses removed together with their survey take the counters and
+    # aggregates with them.
+    return is_deletion_of(origin, Response)
+
+
+@receiver(post_delete, sender=Response)
+def decrement_survey_response_count(sender, instance, origin=None, **kwargs):
+    if is_response_deletion(origin):
+        increment_response_count(instance.survey_id, -1)
+
+
+@receiver(pre_delete, sender=Response)
+def remove_response_from_aggregates(sender, instance, origin=None, **kwargs):
+    if is_response_deletion(origin):
+        remove_response_aggregates(instance)
+
+
+@receiver(post_save, sender=Question)
+def create_question_aggregate(sender, instance, created, **kwargs):
+    if created:
+        QuestionAggregate.objects.create(
+            survey_id=instance.survey_id, question=instance
+        )
+
+
+@receiver(post_save, sender=Option)
+def create_option_aggregate(sender, instance, created, **kwargs):
+    if created:
+        OptionAggregate.objects.create(
+            survey_id=instance.question.survey_id,
+            question_id=instance.question_id,
+            option=instance,
+        )
+
+
+class SurveyCacheInvalidation:
+    """
+    On-commit callback dropping the cached schema and reports of the surveys
+    changed in a transaction.
+
+    The connection only keeps a weak reference to the callback of its current
+    transaction. Running the callback clears it, and so does a rollback: Django
+    discards the callbacks of a rolled back transaction or savepoint, which frees
+    this one, so the next transaction starts with nothing pending.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.surveys = {}
+
+    @classmethod
+    def for_transaction(cls, connection):
+        """Return the callback of the current transaction, registering it if needed."""
+        ref = getattr(connection, "survey_cache_invalidation", None)
+        pending = ref() if ref is not None else None
+        if pending is None:
+            pending = cls(connection)
+            connection.survey_cache_invalidation = weakref.ref(pending)
+            transaction.on_commit(pending, using=connection.alias)
+        return pending
+
+    def __call__(self):
+        self.connection.survey_cache_invalidation = None
+        for survey_id, public_id in self.surveys.items():
+            invalidate_survey_caches(survey_id, public_id)
+
+
+def invalidate_survey_caches(survey_id, public_id):
+    invalidate_survey_detail(public_id)
+    get_report_cache().invalidate(survey_id)
+
+
+def schedule_survey_cache_invalidation(survey_id, get_public_id):
+    """
+    Drop the cached schema and reports of a survey now and again after the commit.
+
+    The second drop covers readers that rebuilt them while the change was still
+    uncommitted. Within a transaction this happens once per survey, however many
+    of its questions and options are saved. get_public_id is only called then.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        invalidate_survey_caches(survey_id, get_public_id())
+        return
+
+    pending = SurveyCacheInvalidation.for_transaction(connection)
+    if survey_id in pending.surveys:
+        return
+
+    public_id = get_public_id()
+    pending.surveys[survey_id] = public_id
+    invalidate_survey_caches(survey_id, public_id)
+
+
+# Reports show the survey title and questions, so schema changes also drop the
+# cached reports of the survey. Questions and options deleted together with their
+# survey or question are covered by the handler of that deletion.
+
+
+@receiver(post_save, sender=Survey)
+@receiver(post_delete, sender=Survey)
+def invalidate_survey_schema(sender, instance, **kwargs):
+    schedule_survey_cache_invalidation(instance.id, lambda: instance.public_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_survey_schema(sender, instance, origin=None, **kwargs):
+    if "created" in kwargs or is_deletion_of(origin, Question):
+        schedule_survey_cache_invalidation(
+            instance.survey_id, lambda: instance.survey.public_id
+        )
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_option_survey_schema(sender, instance, origin=None, **kwargs):
+    if "created" in kwargs or is_deletion_of(origin, Option):
+        question = instance.question
+        schedule_survey_cache_invalidation(
+            question.survey_id, lambda: question.survey.public_id
+        )
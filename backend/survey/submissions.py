@@ -0,0 +1,240 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+
+from .aggregates import AggregateDelta
+from .counters import increment_response_count
+from .models import Answer, Response, Survey
+from .reports import get_report_cache
+from .validation import AnswerRow, SurveyValidationMap, get_validation_map
+
+Submission = Tuple[Dict[str, Any], List[AnswerRow]]
+
+RESPONDENT_FIELDS = {"respondent_name": 100, "respondent_email": 254}
+
+
+@transaction.atomic
+def save_responses(
+    survey: Survey,
+    submissions: List[Submission],
+    question_ids: Iterable[int],
+) -> List[Response]:
+    """
+    Write validated responses with a fixed number of queries.
+
+    Responses, answers and selected options are each inserted with one bulk
+    statement, and the survey aggregates and response counter are updated in the
+    same transaction.
+
+    Args:
+        survey: The survey being answered
+        submissions: List of (response fields, answers) pairs, where answers are
+            (question_id, text_answer, selected_option_ids) tuples that already
+            passed SurveyValidationMap.validate()
+        question_ids: IDs of all questions in the survey
+
+    Returns:
+        The created responses, in submission order
+    """
+    responses = Response.objects.bulk_create(
+        [Response(survey=survey, **fields) for fields, _ in submissions]
+    )
+
+    answers = []
+    answer_options = []
+    for response, (_, answer_rows) in zip(responses, submissions):
+        for question_id, text_answer, option_ids in answer_rows:
+            answers.append(
+                Answer(
+                    survey_id=survey.id,
+                    response=response,
+                    question_id=question_id,
+                    text_answer=text_answer,
+                )
+            )
+            answer_options.append(list(dict.fromkeys(option_ids)))
+
+    Answer.objects.bulk_create(answers)
+
+    through = Answer.selected_options.through
+    through.objects.bulk_create(
+        [
+            through(answer_id=answer.id, option_id=option_id)
+            for answer, option_ids in zip(answers, answer_options)
+            for option_id in option_ids
+        ]
+    )
+
+    delta = AggregateDelta(survey.id, question_ids)
+    for _, answer_rows in submissions:
+        delta.add_response(answer_rows)
+    delta.apply()
+    increment_response_count(survey.id, len(responses))
+
+    transaction.on_commit(lambda: get_report_cache().invalidate(survey.id))
+    return responses
+
+
+def parse_submission(
+    item: Any, validation_map: SurveyValidationMap
+) -> Tuple[Optional[Submission], Dict[str, Any]]:
+    """
+    Validate one raw submission without going through a DRF serializer.
+
+    Accepts the same payload as the single submission endpoint.
+
+    Args:
+        item: Decoded JSON object with respondent fields and an "answers" list,
+            or the exception raised while decoding it
+        validation_map: Validation map of the survey
+
+    Returns:
+        A tuple of (submission, errors). The submission is None when errors is not
+        empty.
+    """
+    if isinstance(item, Exception):
+        return None, {"non_field_errors": [str(item)]}
+    if not isinstance(item, dict):
+        return None, {"non_field_errors": ["Expected a JSON object."]}
+
+    errors = {}
+    fields = {}
+    for name, max_length in RESPONDENT_FIELDS.items():
+        value = item.get(name)
+        if value is None or value == "":
+            fields[name] = None
+        elif not isinstance(value, str) or len(value) > max_length:
+            errors[name] = [f"Expected a string of at most {max_length} characters."]
+        else:
+            fields[name] = value
+
+    if fields.get("respondent_email"):
+        try:
+            validate_email(fields["respondent_email"])
+        except ValidationError as e:
+            errors["respondent_email"] = e.messages
+
+    answers = item.get("answers")
+    if not isinstance(answers, list):
+        errors["answers"] = ["Expected a list of answers."]
+        return None, errors
+
+    answer_rows = []
+    answer_errors = []
+    for answer in answers:
+        row, error = _parse_answer(answer)
+        answer_rows.append(row)
+        answer_errors.append(error)
+
+    if any(answer_errors):
+        errors["answers"] = answer_errors
+    else:
+        errors.update(validation_map.validate(answer_rows))
+
+    if errors:
+        return None, errors
+    return (fields, answer_rows), {}
+
+
+def _parse_answer(answer: Any) -> Tuple[Optional[AnswerRow], Dict[str, Any]]:
+    if not isinstance(answer, dict):
+        return None, {"non_field_errors": ["Expected a JSON object."]}
+
+    errors = {}
+    question_id = answer.get("question")
+    if isinstance(question_id, bool) or not isinstance(question_id, int):
+        errors["question"] = ["A valid integer is required."]
+
+    text_answer = answer.get("text_answer")
+    if text_answer is not None and not isinstance(text_answer, str):
+        errors["text_answer"] = ["Not a valid string."]
+
+    option_ids = answer.get("selected_options") or []
+    if not isinstance(option_ids, list) or not all(
+        isinstance(option_id, int) and not isinstance(option_id, bool)
+        for option_id in option_ids
+    ):
+        errors["selected_options"] = ["Expected a list of integers."]
+
+    if errors:
+        return None, errors
+    return (question_id, text_answer, option_ids), {}
+
+
+def save_response_batch(
+    survey: Survey, items: Iterable[Any], chunk_size: int, max_items: int
+) -> Dict[str, Any]:
+    """
+    Validate and write a batch of raw submissions.
+
+    The validation map of the survey is loaded once for the whole batch. Valid
+    submissions are written in chunks of chunk_size, each chunk in its own
+    transaction, so one failed chunk does not roll back the chunks before it.
+
+    Args:
+        survey: The survey being answered
+        items: Iterable of decoded submissions. May be a lazy stream.
+        chunk_size: Number of submissions read and written per transaction
+        max_items: Maximum number of submissions accepted in one batch
+
+    Returns:
+        Dictionary with "created" and "failed" counts, per-item "results" in
+        input order and "truncated" when the batch exceeded max_items
+    """
+    validation_map = get_validation_map(survey)
+    results = []
+    items = iter(items)
+    truncated = False
+
+    while True:
+        remaining = max_items - len(results)
+        chunk = list(islice(items, min(chunk_size, remaining + 1)))
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            truncated = True
+        if not chunk:
+            break
+
+        offset = len(results)
+        valid = []
+        chunk_results = []
+        for index, item in enumerate(chunk, start=offset):
+            submission, errors = parse_submission(item, validation_map)
+            if errors:
+                chunk_results.append(
+                    {"index": index, "status": "invalid", "errors": errors}
+                )
+            else:
+                chunk_results.append({"index": index, "status": "created"})
+                valid.append((len(chunk_results) - 1, submission))
+
+        if valid:
+            try:
+                responses = save_responses(
+                    survey,
+                    [submission for _, submission in valid],
+                    validation_map.question_ids,
+                )
+            except DatabaseError as e:
+                for position, _ in valid:
+                    chunk_results[position].update(
+                        status="failed", errors={"non_field_errors": [str(e)]}
+                    )
+            else:
+                for (position, _), response in zip(valid, responses):
+                    chunk_results[position]["id"] = response.id
+
+        results.extend(chunk_results)
+        if truncated:
+            break
+
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "truncated": truncated,
+        "results": results,
+    }
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import re
+import time
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from openai_survey import SurveyGenerationRequest, SurveyGenerator
+from openai_survey.cache import GenerationCache, MemoryGenerationBackend
+from openai_survey.scheduler import OpenAIScheduler
+
+from .loaders import ReportDataLoader
+from .models import Option, Question, Survey
+from .reports import get_response_watermark, load_report_data
+from .submissions import save_responses
+from .validation import get_validation_map
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        # Raises CommandError listing the plans if any query scans a large table
+        out = StringIO()
+        call_command("check_query_plans", seed=2000, stdout=out)
+        output = out.getvalue()
+        self.assertIn("use index scans", output)
+
+        # The plans are only meaningful if a per-survey filter is selective
+        checked, total = map(
+            int, re.search(r"with (\d+) of (\d+) responses", output).groups()
+        )
+        self.assertLessEqual(checked * 10, total)
+
+
+class ReportDataLoaderQueryTests(TestCase):
+    RESPONSES = 20
+
+    def setUp(self):
+        self.survey = Survey.objects.create(title="Report", prompt="test")
+        for order, question_type in enumerate(["radio", "checkbox", "text"]):
+            question = Question.objects.create(
+                survey=self.survey,
+                text=f"Question {order + 1}",
+                type=question_type,
+                order=order,
+            )
+            if question_type != "text":
+                for i in range(3):
+                    Option.objects.create(
+                        question=question, text=f"Option {i + 1}", order=i
+                    )
+
+    def add_responses(self, count):
+        validation_map = get_validation_map(self.survey)
+        answers = [
+            (
+                question_id,
+                None if rule.option_ids else "answer",
+                sorted(rule.option_ids)[:1],
+            )
+            for question_id, rule in validation_map.rules.items()
+        ]
+        save_responses(
+            self.survey, [({}, answers)] * count, validation_map.question_ids
+        )
+
+    def count_queries(self, load):
+        with CaptureQueriesContext(connection) as queries:
+            load()
+        return len(queries)
+
+    def assert_queries_independent_of_responses(self, load):
+        self.add_responses(self.RESPONSES)
+        expected = self.count_queries(load)
+
+        self.add_responses(self.RESPONSES * 9)
+        with self.assertNumQueries(expected):
+            load()
+
+    def test_loader_queries_do_not_grow_with_responses(self):
+        self.assert_queries_independent_of_responses(
+            lambda: ReportDataLoader(self.survey).load()
+        )
+
+    def test_report_data_queries_do_not_grow_with_responses(self):
+        self.assert_queries_independent_of_responses(
+            lambda: load_report_data(self.survey, *get_response_watermark(self.survey))
+        )
+
+
+class GenerationEventLoopLagTests(SimpleTestCase):
+    SESSIONS = 10
+    CHUNKS = 50
+    CHUNK_DELAY = 0.02
+    TICK_INTERVAL = 0.005
+    # A client blocking the loop while it waits for each chunk holds the ticker
+    # back for seconds
+    MAX_LAG = 0.1
+
+    def make_async_client(self):
+        async def stream(content):
+            size = len(content) // self.CHUNKS + 1
+            for start in range(0, len(content), size):
+                await asyncio.sleep(self.CHUNK_DELAY)
+                yield SimpleNamespace(
+                    choices=[
+                        SimpleNamespace(
+                            delta=SimpleNamespace(content=content[start : start + size])
+                        )
+                    ],
+                    usage=None,
+                )
+
+        async def create(**kwargs):
+            survey = {
+                "title": kwargs["messages"][-1]["content"][:50],
+                "questions": [
+                    {
+                        "text": f"Question {i + 1}",
+                        "type": "radio",
+                        "options": [{"text": f"Option {j + 1}"} for j in range(4)],
+                    }
+                    for i in range(5)
+                ],
+            }
+            return stream(json.dumps(survey))
+
+        # Stands in for AsyncOpenAI, whose chat attribute is set per instance
+        client = mock.Mock()
+        client.chat.completions.create = mock.AsyncMock(side_effect=create)
+        return client
+
+    async def test_parallel_streams_do_not_block_the_event_loop(self):
+        async_client = self.make_async_client()
+        generator = SurveyGenerator(
+            model="test",
+            client=mock.Mock(),
+            async_client=async_client,
+            cache=GenerationCache(MemoryGenerationBackend(100), ttl=60),
+            scheduler=OpenAIScheduler(
+                requests_per_minute=0,
+                tokens_per_minute=0,
+                max_concurrent=0,
+                max_queue=self.SESSIONS,
+            ),
+        )
+
+        lags = []
+        running = True
+
+        async def tick():
+            while running:
+                start = time.perf_counter()
+                await asyncio.sleep(self.TICK_INTERVAL)
+                lags.append(time.perf_counter() - start - self.TICK_INTERVAL)
+
+        async def generate(index):
+            request = SurveyGenerationRequest(prompt=f"Survey number {index}")
+            return "".join([chunk async for chunk in generator.astream(request)])
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            contents = await asyncio.gather(
+                *[generate(i) for i in range(self.SESSIONS)]
+            )
+        finally:
+            running = False
+            await ticker
+
+        self.assertEqual(
+            async_client.chat.completions.create.await_count, self.SESSIONS
+        )
+        for content in contents:
+            self.assertEqual(len(json.loads(content)["questions"]), 5)
+        self.assertLess(max(lags), self.MAX_LAG)
@@ -5,7 +5,11 @@ from .views import (
     SurveyDeleteAPIView,
     SurveyDetailAPIView,
     SurveyResponseCreateAPIView,
-    SurveyReportView
+    SurveyResponseBatchCreateAPIView,
+    SurveyReportView,
+    ReportJobCreateAPIView,
+    ReportJobStatusAPIView,
+    ReportJobDownloadView
 )
 
 urlpatterns = [
@@ -13,5 +17,9 @@ urlpatterns = [
     path('<str:public_id>/', SurveyDeleteAPIView.as_view(), name='survey-delete'),
     path('<str:public_id>/details/', SurveyDetailAPIView.as_view(), name='survey-detail'),
     path('<str:public_id>/respond/', SurveyResponseCreateAPIView.as_view(), name='survey-respond'),
+    path('<str:public_id>/responses/batch/', SurveyResponseBatchCreateAPIView.as_view(), name='survey-responses-batch'),
     path('<str:public_id>/report/', SurveyReportView.as_view(), name='survey-report'),
+    path('<str:public_id>/report/jobs/', ReportJobCreateAPIView.as_view(), name='survey-report-jobs'),
+    path('<str:public_id>/report/jobs/<uuid:job_id>/', ReportJobStatusAPIView.as_view(), name='survey-report-job'),
+    path('<str:public_id>/report/jobs/<uuid:job_id>/download/', ReportJobDownloadView.as_view(), name='survey-report-job-download'),
 ]
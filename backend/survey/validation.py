@@ -0,0 +1,150 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from .aggregates import is_answered
+from .models import Survey
+from .schema_cache import get_survey_detail
+
+SINGLE_CHOICE_TYPES = ("radio", "dropdown")
+
+AnswerRow = Tuple[int, Optional[str], List[int]]
+
+
+class QuestionRule(NamedTuple):
+    """What a valid answer to one question may contain."""
+
+    type: str
+    required: bool
+    option_ids: FrozenSet[int]
+
+
+class SurveyValidationMap:
+    """
+    Questions of a survey with their types, required flags and allowed options.
+
+    Built from the compiled survey schema, which is cached and invalidated when the
+    survey, its questions or its options change, so validating a submission does
+    not query the database.
+    """
+
+    def __init__(self, rules: Dict[int, QuestionRule]):
+        """
+        Initialize the map.
+
+        Args:
+            rules: Rule of each question of the survey, by question id
+        """
+        self.rules = rules
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, Any]) -> "SurveyValidationMap":
+        """
+        Build the map from a compiled survey schema.
+
+        Args:
+            schema: The "schema" of the survey detail payload
+
+        Returns:
+            The validation map
+        """
+        return cls(
+            {
+                question["id"]: QuestionRule(
+                    type=question["type"],
+                    required=question["required"],
+                    option_ids=frozenset(
+                        option["id"] for option in question["options"]
+                    ),
+                )
+                for question in schema["questions"]
+            }
+        )
+
+    @property
+    def question_ids(self) -> List[int]:
+        """IDs of all questions in the survey."""
+        return list(self.rules)
+
+    def validate(self, answers: Iterable[AnswerRow]) -> Dict[str, Any]:
+        """
+        Check the answers of one submission.
+
+        Answers must belong to questions of this survey, appear once per question
+        and only select options of their question, at most one for single choice
+        questions. Every required question must be answered.
+
+        Args:
+            answers: Iterable of (question_id, text_answer, selected_option_ids)
+
+        Returns:
+            Errors keyed like a DRF serializer: "answers" with one dictionary per
+            answer, and "non_field_errors" for unanswered required questions.
+            Empty when the submission is valid.
+        """
+        answer_errors = []
+        answered = set()
+        seen = set()
+        for question_id, text_answer, option_ids in answers:
+            answer_errors.append(self._validate_answer(question_id, option_ids, seen))
+            seen.add(question_id)
+            if is_answered(text_answer, option_ids):
+                answered.add(question_id)
+
+        errors = {}
+        if any(answer_errors):
+            errors["answers"] = answer_errors
+
+        missing = [
+            question_id
+            for question_id, rule in self.rules.items()
+            if rule.required and question_id not in answered
+        ]
+        if missing:
+            errors["non_field_errors"] = [
+                f"Required questions are not answered: {missing}."
+            ]
+        return errors
+
+    def _validate_answer(
+        self,
+        question_id: int,
+        option_ids: List[int],
+        seen: set,
+    ) -> Dict[str, List[str]]:
+        rule = self.rules.get(question_id)
+        if rule is None:
+            return {
+                "question": [f"Question {question_id} does not belong to this survey."]
+            }
+        if question_id in seen:
+            return {"question": [f"Question {question_id} is answered more than once."]}
+
+        invalid = [
+            option_id for option_id in option_ids if option_id not in rule.option_ids
+        ]
+        if invalid:
+            return {
+                "selected_options": [
+                    f"Options {invalid} do not belong to question {question_id}."
+                ]
+            }
+        if rule.type in SINGLE_CHOICE_TYPES and len(set(option_ids)) > 1:
+            return {
+                "selected_options": [f"Question {question_id} accepts only one option."]
+            }
+        return {}
+
+
+def get_validation_map(survey: Survey) -> SurveyValidationMap:
+    """
+    Get the validation map of a survey from its cached compiled schema.
+
+    Args:
+        survey: The survey being answered
+
+    Returns:
+        The validation map
+    """
+    payload = get_survey_detail(survey.public_id)
+    if payload is None:
+        return SurveyValidationMap({})
+    return SurveyValidationMap.from_schema(payload["data"]["schema"])
@@ -1,24 +1,80 @@
 import sys
 import traceback
+from datetime import datetime, time
 
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.db.models.functions import Left
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
 from django.views import View
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.views import APIView
 from rest_framework.response import Response as DRFResponse
 
-from survey_analytics.report import ReportGenerator
-from .models import Survey, Response, Answer
+from core.db_routers import use_replica
+from .counters import with_live_response_count
+from .jobs import enqueue_report_job
+from .models import Survey, ReportJob
+from .pagination import SurveyCursorPagination
+from .parsers import NDJSONParser
+from .partitions import delete_survey
+from .reports import get_response_watermark, open_survey_report
+from .schema_cache import get_survey_detail
+from .submissions import save_response_batch
 from .serializers import (
     SurveyListSerializer,
     SurveyDetailSerializer,
-    ResponseSerializer
+    ResponseSerializer,
+    ReportJobSerializer
 )
 
 
-class SurveyListAPIView(generics.ListAPIView):
-    queryset = Survey.objects.all().order_by('-created_at')
+class ReplicaReadMixin:
+    # Reads of the whole request go to the read replica while it is usable
+    def dispatch(self, request, *args, **kwargs):
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class SurveyListAPIView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = SurveyListSerializer
+    pagination_class = SurveyCursorPagination
+
+    def get_queryset(self):
+        queryset = Survey.objects.only(
+            'id', 'title', 'created_at', 'public_id', 'response_count'
+        ).annotate(
+            description_preview=Left('description', settings.SURVEY_LIST_DESCRIPTION_LENGTH)
+        )
+
+        params = self.request.query_params
+        if params.get('title_prefix'):
+            queryset = queryset.filter(title__startswith=params['title_prefix'])
+        if params.get('created_after'):
+            queryset = queryset.filter(created_at__gte=self._parse_date(params, 'created_after'))
+        if params.get('created_before'):
+            queryset = queryset.filter(created_at__lt=self._parse_date(params, 'created_before'))
+
+        return with_live_response_count(queryset)
+
+    def _parse_date(self, params, name):
+        value = params[name]
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is not None:
+                parsed = datetime.combine(date, time.min)
+        if parsed is None:
+            raise ValidationError({name: ['Expected an ISO 8601 date or datetime.']})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
 
 
 class SurveyDeleteAPIView(generics.DestroyAPIView):
@@ -28,6 +84,9 @@ class SurveyDeleteAPIView(generics.DestroyAPIView):
     def get_queryset(self):
         return Survey.objects.all()
 
+    def perform_destroy(self, instance):
+        delete_survey(instance)
+
     def destroy(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
@@ -42,39 +101,24 @@ class SurveyDeleteAPIView(generics.DestroyAPIView):
 class SurveyDetailAPIView(generics.RetrieveAPIView):
     serializer_class = SurveyDetailSerializer
     lookup_field = 'public_id'
-    
-    def get_queryset(self):
-        return Survey.objects.all()
-    
-    def get_object(self):
-        obj = super().get_object()
-        print(f"Pobrano ankietę: {obj.title} z ID: {obj.public_id}")
 
-        schema = {
-            'questions': []
-        }
-        
-        questions = obj.questions.all().prefetch_related('options')
-        for question in questions:
-            question_data = {
-                'id': question.id,
-                'text': question.text,
-                'type': question.type,
-                'required': question.required,
-                'options': []
-            }
-            
-            if question.type in ['radio', 'checkbox', 'dropdown']:
-                for option in question.options.all():
-                    question_data['options'].append({
-                        'id': option.id,
-                        'text': option.text
-                    })
-            
-            schema['questions'].append(question_data)
-        
-        obj.schema = schema
-        return obj
+    def retrieve(self, request, *args, **kwargs):
+        payload = get_survey_detail(self.kwargs['public_id'])
+        if payload is None:
+            raise Http404
+
+        response = get_conditional_response(
+            request._request,
+            etag=payload['etag'],
+            last_modified=int(payload['last_modified'].timestamp())
+        )
+        if response is None:
+            response = DRFResponse(payload['data'])
+
+        response['ETag'] = payload['etag']
+        response['Last-Modified'] = http_date(payload['last_modified'].timestamp())
+        response['Cache-Control'] = 'no-cache'
+        return response
 
 
 class SurveyResponseCreateAPIView(generics.CreateAPIView):
@@ -90,102 +134,120 @@ class SurveyResponseCreateAPIView(generics.CreateAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = self.get_serializer(data=request.data)
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), 'survey': survey}
+        )
         serializer.is_valid(raise_exception=True)
 
-        serializer.save(survey=survey)
-
         response_obj = serializer.save(survey=survey)
         print(f"Zapisano odpowiedź: {response_obj.id} dla ankiety: {survey.title}")
-        print(f"Liczba odpowiedzi dla tej ankiety: {survey.responses.count()}")
         
         return DRFResponse(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class SurveyResponseBatchCreateAPIView(APIView):
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, public_id):
+        survey = get_object_or_404(Survey, public_id=public_id)
+        config = settings.SUBMISSION_BATCH
+
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('responses')
+        if isinstance(items, (dict, str)) or items is None:
+            return DRFResponse(
+                {"detail": "Expected a list of responses or an NDJSON stream."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = save_response_batch(
+            survey, items, config['CHUNK_SIZE'], config['MAX_ITEMS']
+        )
+
+        if not result['failed'] and not result['truncated']:
+            response_status = status.HTTP_201_CREATED
+        elif result['created']:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return DRFResponse(result, status=response_status)
+
+
 class SurveyReportView(View):
     def get(self, request, public_id):
         try:
             survey = get_object_or_404(Survey, public_id=public_id)
             print(f"[DEBUG] Znaleziono ankietę: {survey.title} (ID: {survey.id})")
-            responses = Response.objects.filter(survey=survey)
+            last_response_id, response_count = get_response_watermark(survey)
             
-            if not responses.exists():
+            if not response_count:
                 return HttpResponse("Cant generate report", status=400)
 
-            survey_data = self.prepare_survey_data(survey)
-            responses_data = [self.prepare_response_data(response) for response in responses]
-
-            generator = ReportGenerator(survey_data, responses_data)
-            pdf_buffer = generator.generate_report(include_visualizations=True)
+            report_file = open_survey_report(survey, last_response_id, response_count)
             filename = f"survey_report_{survey.public_id}.pdf"
             
-            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            
-            return response
+            return FileResponse(
+                report_file,
+                as_attachment=True,
+                filename=filename,
+                content_type='application/pdf'
+            )
             
         except Exception as e:
             print(f"[ERROR] Error while generating report: {str(e)}")
             traceback.print_exc(file=sys.stdout)
             return HttpResponse(f"Error while generating report: {str(e)}", status=500)
-    
-    def prepare_survey_data(self, survey):
-        questions = survey.questions.all()
-        question_list = []
-        for q in questions:
-            question_data = {
-                "id": q.id,
-                "text": q.text,
-                "type": q.type,
-                "required": q.required,
-                "options": []
-            }
-
-            if hasattr(q, 'options'):
-                for option in q.options.all():
-                    question_data["options"].append({
-                        "id": option.id,
-                        "text": option.text,
-                        "order": getattr(option, 'order', 0)
-                    })
-            
-            question_list.append(question_data)
-        
-        schema = {"questions": question_list}
-        
-        return {
-            "id": survey.id,
-            "title": survey.title,
-            "description": getattr(survey, 'description', ''),
-            "schema": schema,
-            "public_id": survey.public_id,
-            "created_at": survey.created_at.isoformat(),
-            "updated_at": survey.updated_at.isoformat() if survey.updated_at else None
-        }
-    
-    def prepare_response_data(self, response):
-        answers = Answer.objects.filter(response=response)
-        
-        formatted_answers = []
-        for answer in answers:
-            answer_data = {
-                "id": answer.id,
-                "question": answer.question_id,
-                "text_answer": answer.text_answer or ""
-            }
-
-            if hasattr(answer, 'selected_options') and answer.selected_options.exists():
-                answer_data["selected_options"] = [opt.id for opt in answer.selected_options.all()]
-            else:
-                answer_data["selected_options"] = []
-                
-            formatted_answers.append(answer_data)
-        
-        return {
-            "id": response.id,
-            "survey_id": response.survey_id,
-            "created_at": response.created_at.isoformat(),
-            "respondent_name": response.respondent_name or "",
-            "respondent_email": response.respondent_email or "",
-            "answers": formatted_answers
-        }
+
+
+class ReportJobCreateAPIView(APIView):
+    def post(self, request, public_id):
+        survey = get_object_or_404(Survey, public_id=public_id)
+        last_response_id, response_count = get_response_watermark(survey)
+
+        if not response_count:
+            return DRFResponse(
+                {"detail": "Cant generate report"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        job = enqueue_report_job(survey, last_response_id, response_count)
+        serializer = ReportJobSerializer(job, context={'request': request})
+        return DRFResponse(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobStatusAPIView(generics.RetrieveAPIView):
+    serializer_class = ReportJobSerializer
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+
+    def get_queryset(self):
+        return ReportJob.objects.select_related('survey').filter(
+            survey__public_id=self.kwargs['public_id']
+        )
+
+
+class ReportJobDownloadView(View):
+    def get(self, request, public_id, job_id):
+        job = get_object_or_404(
+            ReportJob.objects.select_related('survey'),
+            id=job_id,
+            survey__public_id=public_id
+        )
+
+        if job.status != 'completed':
+            return HttpResponse(f"Report job is {job.status}", status=409)
+
+        try:
+            report_file = open(job.file_path, 'rb')
+        except (FileNotFoundError, ValueError):
+            return HttpResponse("Report has expired, please generate it again", status=410)
+
+        filename = f"survey_report_{job.survey.public_id}.pdf"
+        return FileResponse(
+            report_file,
+            as_attachment=True,
+            filename=filename,
+            content_type='application/pdf'
+        )
@@ -1,69 +1,146 @@
 from collections import Counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+import numpy as np
 import pandas as pd
 
 from .exceptions import AnalysisError
 from .schemas import SurveyAnalysisResult, QuestionAnalysis, QuestionSummary, ChartData
 
+SINGLE_CHOICE_TYPES = ("radio", "dropdown")
+MULTIPLE_CHOICE_TYPES = ("checkbox",)
+
 
 class SurveyAnalyzer:
     """Analyzer for survey response data."""
 
-    def __init__(self, survey_data: Dict[str, Any], responses: List[Dict[str, Any]]):
+    def __init__(
+        self,
+        survey_data: Dict[str, Any],
+        responses: List[Dict[str, Any]],
+        aggregates: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the analyzer with survey data and responses.
 
         Args:
             survey_data: Dictionary with survey metadata and questions
             responses: List of response dictionaries
+            aggregates: Optional precomputed counts with "questions" (question id to
+                answered_count/skipped_count) and "options" (option id to count).
+                When given, choice questions are analyzed from these counts instead
+                of the raw answers.
         """
         self.survey_data = survey_data
         self.responses = responses
-        self.df = self._prepare_dataframe()
+        self.aggregates = aggregates
+        self.questions = survey_data["schema"]["questions"]
+        self.question_index = {q["id"]: pos for pos, q in enumerate(self.questions)}
+        self.df, self.selections = self._prepare_dataframe()
+
+        self._answer_counts = None
+        self._option_counts = None
+        self._text_answers = None
+
+    def _prepare_dataframe(self):
+        """
+        Flatten survey responses into an answers frame and an exploded selections frame.
 
-    def _prepare_dataframe(self) -> pd.DataFrame:
-        """Convert survey responses to a pandas DataFrame."""
+        Returns:
+            A tuple of (answers DataFrame, selections DataFrame). The selections frame
+            has one row per selected option with integer columns, so option counts can
+            be computed without touching Python lists.
+        """
         try:
-            flattened_data = []
+            response_ids = []
+            submitted_at = []
+            question_positions = []
+            text_answers = []
+
+            selection_rows = []
+            selection_questions = []
+            selection_options = []
+            selection_positions = []
+
+            question_index = self.question_index
             for response in self.responses:
-                response_base = {
-                    "response_id": response["id"],
-                    "respondent_name": response.get("respondent_name", ""),
-                    "respondent_email": response.get("respondent_email", ""),
-                    "submitted_at": response.get("created_at", None),
-                }
+                response_id = response["id"]
+                created_at = response.get("created_at", None)
 
                 for answer in response.get("answers", []):
-                    question_id = answer.get("question")
-                    question_data = next(
-                        (
-                            q
-                            for q in self.survey_data["schema"]["questions"]
-                            if q["id"] == question_id
-                        ),
-                        None,
-                    )
-
-                    if not question_data:
+                    question_pos = question_index.get(answer.get("question"))
+                    if question_pos is None:
                         continue
 
-                    answer_row = response_base.copy()
-                    answer_row.update(
-                        {
-                            "question_id": question_id,
-                            "question_text": question_data.get("text", ""),
-                            "question_type": question_data.get("type", ""),
-                            "text_answer": answer.get("text_answer", ""),
-                            "selected_options": answer.get("selected_options", []),
-                        }
-                    )
-                    flattened_data.append(answer_row)
-
-            return pd.DataFrame(flattened_data)
+                    row = len(response_ids)
+                    response_ids.append(response_id)
+                    submitted_at.append(created_at)
+                    question_positions.append(question_pos)
+                    text_answers.append(answer.get("text_answer", ""))
+
+                    for position, option_id in enumerate(
+                        answer.get("selected_options") or []
+                    ):
+                        selection_rows.append(row)
+                        selection_questions.append(question_pos)
+                        selection_options.append(option_id)
+                        selection_positions.append(position)
+
+            df = pd.DataFrame(
+                {
+                    "response_id": pd.Series(response_ids, dtype="int64"),
+                    "submitted_at": pd.Series(submitted_at, dtype="object"),
+                    "question_pos": pd.Series(question_positions, dtype="int64"),
+                    "text_answer": pd.Series(text_answers, dtype="object"),
+                }
+            )
+            selections = pd.DataFrame(
+                {
+                    "row": pd.Series(selection_rows, dtype="int64"),
+                    "question_pos": pd.Series(selection_questions, dtype="int64"),
+                    "option_id": pd.Series(selection_options, dtype="int64"),
+                    "position": pd.Series(selection_positions, dtype="int64"),
+                }
+            )
+            return df, selections
         except Exception as e:
             raise AnalysisError(f"Failed to prepare data frame: {str(e)}")
 
+    def _compute_counts(self) -> None:
+        """Compute every per-question count in a single pass over the frames."""
+        num_questions = len(self.questions)
+
+        self._answer_counts = np.bincount(
+            self.df["question_pos"].to_numpy(), minlength=num_questions
+        )
+
+        is_multiple = np.array(
+            [q["type"] in MULTIPLE_CHOICE_TYPES for q in self.questions], dtype=bool
+        )
+        selections = self.selections
+        if len(selections):
+            counted = selections[
+                (selections["position"].to_numpy() == 0)
+                | is_multiple[selections["question_pos"].to_numpy()]
+            ]
+            grouped = counted.groupby(["question_pos", "option_id"], sort=False).size()
+        else:
+            grouped = pd.Series(dtype="int64")
+
+        option_counts = {}
+        for (question_pos, option_id), count in grouped.items():
+            option_counts.setdefault(int(question_pos), {})[int(option_id)] = int(count)
+        self._option_counts = option_counts
+
+        is_text = np.array([q["type"] == "text" for q in self.questions], dtype=bool)
+        text_df = self.df[is_text[self.df["question_pos"].to_numpy()]]
+        text_df = text_df[text_df["text_answer"].notna()]
+        self._text_answers = (
+            text_df.groupby("question_pos", sort=False)["text_answer"]
+            .agg(list)
+            .to_dict()
+        )
+
     def analyze(self) -> SurveyAnalysisResult:
         """
         Perform complete analysis of survey responses.
@@ -74,17 +151,16 @@ class SurveyAnalyzer:
         try:
             total_responses = len(self.responses)
 
-            if (
-                "submitted_at" in self.df.columns
-                and self.df["submitted_at"].notna().any()
-            ):
+            if self.df["submitted_at"].notna().any():
                 avg_time = "N/A"
             else:
                 avg_time = None
 
+            self._compute_counts()
+
             questions_analysis = []
-            for question in self.survey_data["schema"]["questions"]:
-                question_analysis = self._analyze_question(question)
+            for question_pos, question in enumerate(self.questions):
+                question_analysis = self._analyze_question(question_pos, question)
                 questions_analysis.append(question_analysis)
 
             completion_rate = 1.0
@@ -100,63 +176,113 @@ class SurveyAnalyzer:
         except Exception as e:
             raise AnalysisError(f"Failed to analyze survey: {str(e)}")
 
-    def _analyze_question(self, question: Dict[str, Any]) -> QuestionAnalysis:
+    def _analyze_question(
+        self, question_pos: int, question: Dict[str, Any]
+    ) -> QuestionAnalysis:
         """
         Analyze responses for a specific question.
 
         Args:
+            question_pos: Position of the question in the survey schema
             question: Question data dictionary
 
         Returns:
             QuestionAnalysis object with analysis results
         """
-        question_id = question["id"]
         question_type = question["type"]
-        question_df = self.df[self.df["question_id"] == question_id]
+        response_count = int(self._answer_counts[question_pos])
 
-        response_count = len(question_df)
+        aggregate = self._question_aggregate(question)
+        if aggregate is not None:
+            response_count, counts_by_id = aggregate
+        else:
+            counts_by_id = self._option_counts.get(question_pos, {})
 
         if question_type == "text":
-            return self._analyze_text_question(question, question_df)
-        elif question_type in ["radio", "dropdown"]:
-            return self._analyze_single_choice_question(question, question_df)
-        elif question_type == "checkbox":
-            return self._analyze_multiple_choice_question(question, question_df)
+            return self._analyze_text_question(
+                question, response_count, self._text_answers.get(question_pos, [])
+            )
+        elif question_type in SINGLE_CHOICE_TYPES:
+            return self._analyze_single_choice_question(
+                question, response_count, counts_by_id
+            )
+        elif question_type in MULTIPLE_CHOICE_TYPES:
+            return self._analyze_multiple_choice_question(
+                question, response_count, counts_by_id
+            )
         else:
             summary = QuestionSummary(
-                question_id=question_id,
+                question_id=question["id"],
                 question_text=question["text"],
                 question_type=question_type,
                 response_count=response_count,
             )
             return QuestionAnalysis(
                 summary=summary,
-                chart_data={},
-                insights="Question type not supported for detailed analysis.",
+                chart_data=ChartData(type="bar", title=question["text"]),
+                insights=["Question type not supported for detailed analysis."],
             )
 
+    def _question_aggregate(self, question: Dict[str, Any]):
+        """
+        Look up precomputed counts for a choice question.
+
+        Returns:
+            A tuple of (response_count, counts by option id), or None if the
+            question has to be analyzed from raw answers
+        """
+        if not self.aggregates or question["type"] == "text":
+            return None
+
+        question_counts = self.aggregates["questions"].get(question["id"])
+        if question_counts is None:
+            return None
+
+        option_counts = self.aggregates["options"]
+        counts_by_id = {
+            opt["id"]: option_counts.get(opt["id"], 0) for opt in question["options"]
+        }
+        return question_counts["answered_count"], counts_by_id
+
+    @staticmethod
+    def _label_option_counts(
+        question: Dict[str, Any], counts_by_id: Dict[int, int], include_zero: bool
+    ) -> Dict[str, int]:
+        """Map option id counts to option labels, in the question's option order."""
+        option_counts = {}
+        for opt in question["options"]:
+            count = counts_by_id.get(opt["id"], 0)
+            if count or include_zero:
+                option_counts[opt["text"]] = option_counts.get(opt["text"], 0) + count
+
+        known_ids = {opt["id"] for opt in question["options"]}
+        for option_id, count in counts_by_id.items():
+            if option_id not in known_ids:
+                label = f"Option {option_id}"
+                option_counts[label] = option_counts.get(label, 0) + count
+
+        return option_counts
+
     def _analyze_text_question(
-        self, question: Dict[str, Any], question_df: pd.DataFrame
+        self, question: Dict[str, Any], response_count: int, answers: List[str]
     ) -> QuestionAnalysis:
         """Analyze a text question."""
         question_id = question["id"]
 
-        text_responses = question_df["text_answer"].dropna().tolist()
-        text_responses = [t for t in text_responses if t.strip()]
+        text_responses = [t for t in answers if t.strip()]
 
-        all_words = " ".join(text_responses).lower().split()
-        word_counts = Counter(all_words)
+        all_text = " ".join(text_responses)
+        word_counts = Counter(all_text.lower().split())
         common_words = dict(word_counts.most_common(10))
 
         summary = QuestionSummary(
             question_id=question_id,
             question_text=question["text"],
             question_type=question["type"],
-            response_count=len(question_df),
+            response_count=response_count,
             text_responses=text_responses[:10],
         )
 
-        all_text = " ".join(text_responses)
         chart_data = ChartData(type="wordcloud", title=question["text"], text=all_text)
 
         insight_text = f"Received {len(text_responses)} text responses. Most common words: {', '.join(list(common_words.keys())[:5])}"
@@ -166,28 +292,23 @@ class SurveyAnalyzer:
         )
 
     def _analyze_single_choice_question(
-        self, question: Dict[str, Any], question_df: pd.DataFrame
+        self,
+        question: Dict[str, Any],
+        response_count: int,
+        counts_by_id: Dict[int, int],
     ) -> QuestionAnalysis:
         """Analyze a single choice question (radio or dropdown)."""
         question_id = question["id"]
 
-        option_map = {opt["id"]: opt["text"] for opt in question["options"]}
-
-        option_counts = {}
-        for option_id_list in question_df["selected_options"]:
-            if not option_id_list:
-                continue
-
-            if len(option_id_list) > 0:
-                option_id = option_id_list[0]
-                option_text = option_map.get(option_id, f"Option {option_id}")
-                option_counts[option_text] = option_counts.get(option_text, 0) + 1
+        option_counts = self._label_option_counts(
+            question, counts_by_id, include_zero=False
+        )
 
         summary = QuestionSummary(
             question_id=question_id,
             question_text=question["text"],
             question_type=question["type"],
-            response_count=len(question_df),
+            response_count=response_count,
             option_counts=option_counts,
         )
 
@@ -199,35 +320,31 @@ class SurveyAnalyzer:
         )
 
         most_popular = max(option_counts.items(), key=lambda x: x[1], default=(None, 0))
-        insight_text = f"Most popular response: '{most_popular[0]}' ({most_popular[1]} responses, {most_popular[1]/len(question_df)*100:.1f}%)"
+        share = most_popular[1] / response_count * 100 if response_count else 0.0
+        insight_text = f"Most popular response: '{most_popular[0]}' ({most_popular[1]} responses, {share:.1f}%)"
 
         return QuestionAnalysis(
             summary=summary, chart_data=chart_data, insights=[insight_text]
         )
 
     def _analyze_multiple_choice_question(
-        self, question: Dict[str, Any], question_df: pd.DataFrame
+        self,
+        question: Dict[str, Any],
+        response_count: int,
+        counts_by_id: Dict[int, int],
     ) -> QuestionAnalysis:
         """Analyze a multiple choice question (checkbox)."""
         question_id = question["id"]
 
-        option_map = {opt["id"]: opt["text"] for opt in question["options"]}
-
-        option_counts = {opt["text"]: 0 for opt in question["options"]}
-
-        for option_id_list in question_df["selected_options"]:
-            if not option_id_list:
-                continue
-
-            for option_id in option_id_list:
-                option_text = option_map.get(option_id, f"Option {option_id}")
-                option_counts[option_text] = option_counts.get(option_text, 0) + 1
+        option_counts = self._label_option_counts(
+            question, counts_by_id, include_zero=True
+        )
 
         summary = QuestionSummary(
             question_id=question_id,
             question_text=question["text"],
             question_type=question["type"],
-            response_count=len(question_df),
+            response_count=response_count,
             option_counts=option_counts,
         )
 
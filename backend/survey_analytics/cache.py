@@ -0,0 +1,387 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+
+class MemoryStore:
+    """Thread-safe LRU store of byte payloads bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes: Maximum total size of stored payloads. 0 disables the store.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the payload for a key and mark it as recently used."""
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Store a payload, evicting least recently used entries to stay within size."""
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+
+            self._items[key] = data
+            self.size += len(data)
+
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every entry whose key starts with the prefix."""
+        with self._lock:
+            for key in [k for k in self._items if k.startswith(prefix)]:
+                self.size -= len(self._items.pop(key))
+
+
+class DiskStore:
+    """Directory of byte payloads bounded by total size, evicting oldest files first."""
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int, suffix: str = ""):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding the cached files. Created if missing.
+            max_bytes: Maximum total size of the directory
+            suffix: File name suffix for stored payloads
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        """Return the file path used for a key."""
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the payload for a key, or None if it is not on disk."""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open the file of a key for reading, or return None if it is not on disk."""
+        path = self.path_for(key)
+        try:
+            fileobj = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return fileobj
+
+    def set(self, key: str, data: bytes) -> None:
+        """Atomically write a payload and evict old files if the directory is too large."""
+        if len(data) > self.max_bytes:
+            return
+
+        self._write(key, lambda tmp_file: tmp_file.write(data))
+
+    def set_file(self, key: str, fileobj: BinaryIO, size: int) -> None:
+        """Atomically copy a readable file into the store without loading it in memory."""
+        if size > self.max_bytes:
+            return
+
+        self._write(key, lambda tmp_file: shutil.copyfileobj(fileobj, tmp_file))
+
+    def _write(self, key: str, write) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                write(tmp_file)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._evict()
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every file whose key starts with the prefix."""
+        for path in self.directory.glob(f"{prefix}*{self.suffix}"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        """Remove least recently used files until the directory fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob(f"*{self.suffix}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+class ReportCache:
+    """
+    Two-tier cache of generated report files.
+
+    Entries are keyed by survey, a response watermark (latest response id and
+    response count) and report options, so a new response always produces a new
+    key. Stale entries of a survey can be dropped with invalidate().
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+        memory_max_entry_bytes: int = 8 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory for the disk tier. If None, only memory is used.
+            memory_max_bytes: Size limit of the in-memory tier
+            disk_max_bytes: Size limit of the disk tier
+            memory_max_entry_bytes: Reports larger than this are only kept on disk,
+                so they are never read into memory as a whole
+        """
+        self.memory = MemoryStore(memory_max_bytes)
+        self.memory_max_entry_bytes = memory_max_entry_bytes
+        self.disk = (
+            DiskStore(directory, disk_max_bytes, suffix=".pdf") if directory else None
+        )
+
+    @staticmethod
+    def make_key(
+        survey_id: int,
+        last_response_id: Optional[int],
+        response_count: int,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Build a cache key for a report.
+
+        Args:
+            survey_id: ID of the survey
+            last_response_id: ID of the latest response of the survey
+            response_count: Number of responses of the survey
+            options: Report options that change the output
+
+        Returns:
+            A file-name safe key
+        """
+        options_hash = hashlib.sha256(
+            json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        return f"{ReportCache._survey_prefix(survey_id)}{last_response_id or 0}-{response_count}-{options_hash}"
+
+    @staticmethod
+    def _survey_prefix(survey_id: int) -> str:
+        return f"survey-{survey_id}-"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached report, promoting disk hits to memory."""
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.memory.set(key, data)
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Store a report in both tiers."""
+        self.memory.set(key, data)
+        if self.disk is not None:
+            self.disk.set(key, data)
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Open a cached report for reading.
+
+        Returns:
+            A readable binary file, or None on a miss. Memory hits are wrapped in a
+            BytesIO sharing the cached buffer; disk hits are opened in place.
+        """
+        data = self.memory.get(key)
+        if data is not None:
+            return BytesIO(data)
+
+        if self.disk is None:
+            return None
+
+        fileobj = self.disk.open(key)
+        if (
+            fileobj is not None
+            and os.fstat(fileobj.fileno()).st_size <= self.memory_max_entry_bytes
+        ):
+            with fileobj:
+                data = fileobj.read()
+            self.memory.set(key, data)
+            return BytesIO(data)
+        return fileobj
+
+    def put_file(self, key: str, fileobj: BinaryIO) -> None:
+        """
+        Store a report from a readable, seekable file positioned at its start.
+
+        Small reports are kept in both tiers. Large reports are streamed to the disk
+        tier only.
+        """
+        start = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell() - start
+        fileobj.seek(start)
+
+        if size <= self.memory_max_entry_bytes:
+            self.set(key, fileobj.read())
+        elif self.disk is not None:
+            self.disk.set_file(key, fileobj, size)
+        fileobj.seek(start)
+
+    def invalidate(self, survey_id: int) -> None:
+        """Drop every cached report of a survey."""
+        prefix = self._survey_prefix(survey_id)
+        self.memory.delete_prefix(prefix)
+        if self.disk is not None:
+            self.disk.delete_prefix(prefix)
+
+
+class ChartCache:
+    """
+    Content-addressed cache of rendered chart images.
+
+    Keys are a stable hash of the chart data and the renderer settings, so a chart
+    is only rendered again when its labels, values, text or styling change.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int = 32 * 1024 * 1024,
+        directory: Optional[Union[str, Path]] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            memory_max_bytes: Size limit of the in-memory tier
+            directory: Optional directory for the disk tier
+            disk_max_bytes: Size limit of the disk tier
+        """
+        self.memory = MemoryStore(memory_max_bytes)
+        self.disk = (
+            DiskStore(directory, disk_max_bytes, suffix=".png") if directory else None
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(chart_data: Any, renderer_settings: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a chart.
+
+        Args:
+            chart_data: ChartData model or dictionary
+            renderer_settings: Settings of the visualizer that affect the output
+
+        Returns:
+            Hex digest identifying the rendered image
+        """
+        if hasattr(chart_data, "model_dump"):
+            chart_data = chart_data.model_dump()
+        payload = json.dumps(
+            {"chart": chart_data, "renderer": renderer_settings},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached image and count the lookup as a hit or miss."""
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.memory.set(key, data)
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return data
+
+    def set(self, key: str, image: bytes) -> None:
+        """Store a rendered PNG image."""
+        self.memory.set(key, image)
+        if self.disk is not None:
+            self.disk.set(key, image)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and memory_bytes
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_bytes": self.memory.size,
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Benchmark report export time and peak memory with raw PNG chart payloads against
+the previous base64 round trip (encode after rendering, decode before the PDF).
+Run this from the backend directory: python -m survey_analytics.chart_payload_benchmark
+"""
+
+import argparse
+import base64
+import time
+import tracemalloc
+from io import BytesIO
+
+from survey_analytics.chart_render_benchmark import build_charts
+from survey_analytics.exporters import PDFExporter
+from survey_analytics.schemas import (
+    QuestionAnalysis,
+    QuestionSummary,
+    SurveyAnalysisResult,
+)
+from survey_analytics.visualizers import SurveyVisualizer
+
+
+def build_result(charts, images):
+    """Build an analysis result holding the rendered chart images."""
+    questions = []
+    for i, (chart, image) in enumerate(zip(charts, images)):
+        summary = QuestionSummary(
+            question_id=i + 1,
+            question_text=chart.title,
+            question_type="text" if chart.type == "wordcloud" else "radio",
+            response_count=100,
+        )
+        questions.append(
+            QuestionAnalysis(summary=summary, chart_data=chart, chart_image=image)
+        )
+    return SurveyAnalysisResult(
+        survey_id=1,
+        survey_title="Benchmark",
+        total_responses=100,
+        completion_rate=1.0,
+        questions=questions,
+    )
+
+
+def export_raw(charts, images):
+    """Export with raw PNG bytes, as the report pipeline does now."""
+    return PDFExporter(build_result(charts, images)).export(BytesIO())
+
+
+def export_base64(charts, images):
+    """Export through a base64 copy of every image, as the pipeline did before."""
+    encoded = [base64.b64encode(image).decode("utf-8") for image in images]
+    decoded = [base64.b64decode(image) for image in encoded]
+    return PDFExporter(build_result(charts, decoded)).export(BytesIO())
+
+
+def measure(name, export, charts, images, rounds):
+    """Print the best time and the peak traced memory of an export path."""
+    export(charts, images)
+
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        export(charts, images)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    export(charts, images)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:>7}: {best * 1000:.1f}ms, peak {peak / 1024 / 1024:.2f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--charts", type=int, default=24, help="Number of charts")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per path")
+    args = parser.parse_args()
+
+    charts = build_charts(args.charts)
+    visualizer = SurveyVisualizer()
+    images = [visualizer.create_chart(chart) for chart in charts]
+    total = sum(len(image) for image in images)
+    print(f"{len(images)} charts, {total / 1024 / 1024:.2f}MB of PNG data")
+
+    measure("base64", export_base64, charts, images, args.rounds)
+    measure("raw", export_raw, charts, images, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
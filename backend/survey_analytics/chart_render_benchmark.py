@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Benchmark sequential chart rendering against the parallel render pool.
+Run this from the backend directory: python -m survey_analytics.chart_render_benchmark
+"""
+
+import argparse
+import os
+import random
+import time
+
+from survey_analytics.schemas import ChartData
+from survey_analytics.visualizers import SurveyVisualizer, get_chart_render_pool
+
+WORDS = "service quality price support delivery app design speed team feature".split()
+
+
+def build_charts(count):
+    """Build a mix of bar, pie and word cloud charts."""
+    random.seed(42)
+    charts = []
+    for i in range(count):
+        kind = ("bar", "pie", "wordcloud")[i % 3]
+        if kind == "wordcloud":
+            text = " ".join(random.choice(WORDS) for _ in range(300))
+            charts.append(ChartData(type=kind, title=f"Question {i + 1}", text=text))
+        else:
+            labels = [f"Option {j + 1}" for j in range(5)]
+            values = [random.randint(0, 500) for _ in labels]
+            charts.append(
+                ChartData(type=kind, title=f"Question {i + 1}", labels=labels, values=values)
+            )
+    return charts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--charts", type=int, default=48, help="Number of charts")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Largest pool size to measure",
+    )
+    args = parser.parse_args()
+
+    charts = build_charts(args.charts)
+
+    visualizer = SurveyVisualizer()
+    visualizer.create_chart(charts[0])
+    start = time.perf_counter()
+    for chart in charts:
+        visualizer.create_chart(chart)
+    sequential = time.perf_counter() - start
+    print(f"sequential: {sequential:.2f}s for {len(charts)} charts")
+
+    workers = 1
+    while workers <= args.max_workers:
+        pool = get_chart_render_pool(workers)
+        pool.render(charts[:workers])
+
+        start = time.perf_counter()
+        pool.render(charts)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{workers:>2} workers: {elapsed:.2f}s, speedup {sequential / elapsed:.2f}x"
+        )
+
+        pool.shutdown()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
-import base64
 from abc import ABC, abstractmethod
 from datetime import datetime
 from io import BytesIO
+from typing import BinaryIO, Optional
 
 import pdfkit
 
@@ -52,15 +52,24 @@ class Exporter(ABC):
         self.analysis_result = analysis_result
 
     @abstractmethod
-    def export(self) -> BytesIO:
-        """Export to a specific format."""
+    def export(self, target: Optional[BinaryIO] = None) -> BinaryIO:
+        """
+        Export to a specific format.
+
+        Args:
+            target: Writable binary file-like object to write the document to.
+                If None, a new BytesIO is used.
+
+        Returns:
+            The target, positioned at the start of the document
+        """
         pass
 
 
 class PDFExporter(Exporter):
     """Export analysis results to PDF format."""
 
-    def export(self) -> BytesIO:
+    def export(self, target: Optional[BinaryIO] = None) -> BinaryIO:
         """Export to PDF."""
         if not REPORTLAB_AVAILABLE:
             raise ExportError(
@@ -68,7 +77,8 @@ class PDFExporter(Exporter):
             )
 
         try:
-            buffer = BytesIO()
+            buffer = target if target is not None else BytesIO()
+            start = buffer.tell()
             doc = SimpleDocTemplate(
                 buffer,
                 pagesize=A4,
@@ -159,8 +169,7 @@ class PDFExporter(Exporter):
                 if hasattr(question, "chart_image") and question.chart_image:
 
                     try:
-                        img_data = base64.b64decode(question.chart_image)
-                        img = Image(BytesIO(img_data))
+                        img = Image(BytesIO(question.chart_image))
 
                         img.drawHeight = 3.5 * inch
                         img.drawWidth = 5 * inch
@@ -188,7 +197,7 @@ class PDFExporter(Exporter):
 
             doc.build(story)
 
-            buffer.seek(0)
+            buffer.seek(start)
             return buffer
 
         except Exception as e:
@@ -198,15 +207,18 @@ class PDFExporter(Exporter):
 class ExcelExporter(Exporter):
     """Exports survey analysis to Excel."""
 
-    def export(self) -> BytesIO:
+    def export(self, target: Optional[BinaryIO] = None) -> BinaryIO:
         """
         Export the analysis to an Excel file.
 
+        Args:
+            target: Writable binary file-like object. If None, a new BytesIO is used.
+
         Returns:
-            BytesIO object containing the Excel file
+            The target containing the Excel file
         """
         try:
-            buffer = BytesIO()
+            buffer = target if target is not None else BytesIO()
 
             with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
 
@@ -1,12 +1,13 @@
 from enum import Enum
 from io import BytesIO
-from typing import Dict, Any
+from typing import BinaryIO, Dict, Any, Optional
 
 from .analyzers import SurveyAnalyzer
+from .cache import ChartCache
 from .exceptions import SurveyAnalyticsError
 from .exporters import PDFExporter
 from .schemas import SurveyAnalysisResult
-from .visualizers import SurveyVisualizer
+from .visualizers import SurveyVisualizer, render_charts_parallel
 
 
 class ReportFormat(Enum):
@@ -18,18 +19,31 @@ class ReportFormat(Enum):
 class ReportGenerator:
     """Main class for generating survey reports."""
 
-    def __init__(self, survey_data: Dict[str, Any], responses: list):
+    def __init__(
+        self,
+        survey_data: Dict[str, Any],
+        responses: list,
+        aggregates: Optional[Dict[str, Any]] = None,
+        chart_workers: int = 0,
+        chart_cache: Optional[ChartCache] = None,
+    ):
         """
         Initialize the report generator.
 
         Args:
             survey_data: Dictionary with survey metadata and questions
             responses: List of response dictionaries
+            aggregates: Optional precomputed choice counts passed to SurveyAnalyzer
+            chart_workers: Number of render processes for charts. 0 or 1 renders
+                charts sequentially in this process.
+            chart_cache: Optional cache consulted before rendering each chart
         """
         self.survey_data = survey_data
         self.responses = responses
-        self.analyzer = SurveyAnalyzer(survey_data, responses)
+        self.analyzer = SurveyAnalyzer(survey_data, responses, aggregates)
         self.visualizer = SurveyVisualizer()
+        self.chart_workers = chart_workers
+        self.chart_cache = chart_cache
         self.analysis_result = None
 
     def generate_analysis(self) -> SurveyAnalysisResult:
@@ -50,28 +64,58 @@ class ReportGenerator:
         if not self.analysis_result:
             self.generate_analysis()
 
-        for question in self.analysis_result.questions:
-            chart_image = self.visualizer.create_chart(question.chart_data)
+        questions = self.analysis_result.questions
+
+        chart_images = [None] * len(questions)
+        cache_keys = [None] * len(questions)
+        if self.chart_cache is not None:
+            for i, question in enumerate(questions):
+                cache_keys[i] = self.chart_cache.make_key(
+                    question.chart_data, self.visualizer.settings
+                )
+                chart_images[i] = self.chart_cache.get(cache_keys[i])
+
+        to_render = [i for i, image in enumerate(chart_images) if image is None]
+        charts = [questions[i].chart_data for i in to_render]
+
+        if self.chart_workers > 1 and len(charts) > 1:
+            rendered = render_charts_parallel(
+                charts, workers=self.chart_workers, style=self.visualizer.style
+            )
+        else:
+            rendered = [self.visualizer.create_chart(chart) for chart in charts]
+
+        for i, chart_image in zip(to_render, rendered):
+            chart_images[i] = chart_image
+            if self.chart_cache is not None:
+                self.chart_cache.set(cache_keys[i], chart_image)
+
+        for question, chart_image in zip(questions, chart_images):
             question.chart_image = chart_image
 
-    def export_report(self, include_visualizations: bool = True) -> BytesIO:
+    def export_report(
+        self, include_visualizations: bool = True, target: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Export analysis results to PDF format.
 
         Args:
             include_visualizations: Whether to include visualizations
+            target: Writable binary file-like object to write the report to.
+                If None, a new BytesIO is used.
 
         Returns:
-            BytesIO object containing the PDF report
+            The target containing the PDF report, positioned at its start
         """
         if not self.analysis_result:
             self.generate_analysis()
 
         if not self.analysis_result.questions:
 
-            empty_buffer = BytesIO()
+            empty_buffer = target if target is not None else BytesIO()
+            start = empty_buffer.tell()
             empty_buffer.write(b"No questions found in survey")
-            empty_buffer.seek(0)
+            empty_buffer.seek(start)
             return empty_buffer
 
         if (
@@ -82,17 +126,21 @@ class ReportGenerator:
             self.add_visualizations()
 
         exporter = PDFExporter(self.analysis_result)
-        return exporter.export()
+        return exporter.export(target)
 
-    def generate_report(self, include_visualizations: bool = True) -> BytesIO:
+    def generate_report(
+        self, include_visualizations: bool = True, target: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Generate a complete PDF report in one step.
 
         Args:
             include_visualizations: Whether to include visualizations
+            target: Writable binary file-like object to write the report to.
+                If None, a new BytesIO is used.
 
         Returns:
-            BytesIO object containing the PDF report
+            The target containing the PDF report, positioned at its start
         """
         try:
 
@@ -101,7 +149,7 @@ class ReportGenerator:
             if include_visualizations:
                 self.add_visualizations()
 
-            return self.export_report(include_visualizations)
+            return self.export_report(include_visualizations, target)
         except Exception as e:
             raise SurveyAnalyticsError(f"Failed to generate report: {str(e)}")
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class RespondentInfo(BaseModel):
@@ -54,10 +54,15 @@ class ChartData(BaseModel):
 class QuestionAnalysis(BaseModel):
     """Complete analysis for a single question."""
 
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
     summary: QuestionSummary
     chart_data: ChartData
     insights: List[str] = []
-    chart_image: Optional[str] = None
+    chart_image: Optional[bytes] = Field(
+        default=None,
+        description="PNG image bytes, serialized as base64 only in JSON output",
+    )
 
 
 class SurveyAnalysisResult(BaseModel):
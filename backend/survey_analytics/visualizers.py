@@ -4,22 +4,34 @@ import matplotlib.pyplot as plt
 matplotlib.use("Agg")
 import seaborn as sns
 import io
-from typing import Dict, Any, Union
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Union
 from wordcloud import WordCloud
 import base64
 
+from .exceptions import VisualizationError
 from .schemas import ChartData
 
 
 class SurveyVisualizer:
     """Class for creating visualizations from survey data."""
 
-    def __init__(self, style: str = "whitegrid"):
+    def __init__(self, style: str = "whitegrid", dpi: int = 100):
         """Initialize the visualizer with a specified style."""
         self.style = style
+        self.dpi = dpi
         sns.set_style(self.style)
 
-    def create_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> str:
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Renderer settings that affect the produced images."""
+        return {"style": self.style, "dpi": self.dpi, "format": "png"}
+
+    def create_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> bytes:
         """
         Create chart visualization based on chart data.
 
@@ -27,7 +39,7 @@ class SurveyVisualizer:
             chart_data: ChartData model or dictionary with data for chart visualization
 
         Returns:
-            Base64-encoded image string
+            PNG image bytes
         """
         if isinstance(chart_data, dict):
             chart_type = chart_data.get("type", "bar")
@@ -44,7 +56,19 @@ class SurveyVisualizer:
 
             return self._create_bar_chart(chart_data)
 
-    def _create_bar_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> str:
+    def create_chart_base64(self, chart_data: Union[ChartData, Dict[str, Any]]) -> str:
+        """
+        Create a chart as a base64-encoded string, for JSON consumers.
+
+        Args:
+            chart_data: ChartData model or dictionary with data for chart visualization
+
+        Returns:
+            Base64-encoded PNG image string
+        """
+        return base64.b64encode(self.create_chart(chart_data)).decode("ascii")
+
+    def _create_bar_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> bytes:
         """Create a bar chart visualization."""
         plt.figure(figsize=(10, 6))
 
@@ -65,9 +89,9 @@ class SurveyVisualizer:
         plt.xlabel("Number of responses")
         plt.tight_layout()
 
-        return self._fig_to_base64()
+        return self._fig_to_png()
 
-    def _create_pie_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> str:
+    def _create_pie_chart(self, chart_data: Union[ChartData, Dict[str, Any]]) -> bytes:
         """Create a pie chart visualization."""
         plt.figure(figsize=(8, 8))
 
@@ -88,9 +112,9 @@ class SurveyVisualizer:
         plt.title(title)
         plt.tight_layout()
 
-        return self._fig_to_base64()
+        return self._fig_to_png()
 
-    def _create_wordcloud(self, chart_data: Union[ChartData, Dict[str, Any]]) -> str:
+    def _create_wordcloud(self, chart_data: Union[ChartData, Dict[str, Any]]) -> bytes:
         """Create a word cloud visualization."""
         try:
             from wordcloud import WordCloud
@@ -116,22 +140,137 @@ class SurveyVisualizer:
             plt.title(title)
             plt.tight_layout()
 
-            return self._fig_to_base64()
+            return self._fig_to_png()
         except ImportError:
             return self._get_empty_chart("WordCloud package not installed")
 
-    def _get_empty_chart(self, message: str) -> str:
+    def _get_empty_chart(self, message: str) -> bytes:
         """Create an empty chart with a message."""
         plt.figure(figsize=(10, 6))
         plt.text(0.5, 0.5, message, ha="center", va="center", fontsize=14)
         plt.axis("off")
-        return self._fig_to_base64()
+        return self._fig_to_png()
 
-    def _fig_to_base64(self) -> str:
-        """Convert matplotlib figure to base64 encoded string."""
+    def _fig_to_png(self) -> bytes:
+        """Convert matplotlib figure to PNG bytes."""
         buffer = io.BytesIO()
-        plt.savefig(buffer, format="png", dpi=100, bbox_inches="tight")
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        plt.savefig(buffer, format="png", dpi=self.dpi, bbox_inches="tight")
         plt.close()
-        return image_base64
+        return buffer.getvalue()
+
+
+_worker_visualizer = None
+
+
+def _init_render_worker(style: str) -> None:
+    """Create the worker's visualizer and render one chart to load fonts and caches."""
+    global _worker_visualizer
+    _worker_visualizer = SurveyVisualizer(style)
+    _worker_visualizer.create_chart(
+        ChartData(type="bar", title="warmup", labels=["a"], values=[1])
+    )
+
+
+def _render_in_worker(chart_data: Union[ChartData, Dict[str, Any]]) -> bytes:
+    """Render a chart with the worker's visualizer."""
+    return _worker_visualizer.create_chart(chart_data)
+
+
+class ChartRenderPool:
+    """
+    Persistent pool of warm render processes.
+
+    Each process imports matplotlib, seaborn and wordcloud and renders a warmup
+    chart once, so jobs only pay for the chart itself. Charts are rendered in
+    parallel and returned in input order.
+    """
+
+    def __init__(self, workers: Optional[int] = None, style: str = "whitegrid"):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of render processes. Defaults to the number of CPUs.
+            style: Seaborn style used by the workers
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.style = style
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_render_worker,
+            initargs=(style,),
+        )
+
+    def render(self, charts: List[Union[ChartData, Dict[str, Any]]]) -> List[bytes]:
+        """
+        Render charts in parallel.
+
+        Args:
+            charts: Chart data for each chart
+
+        Returns:
+            PNG image bytes, in the same order as the input
+        """
+        chunksize = max(1, len(charts) // (self.workers * 4))
+        return list(self._executor.map(_render_in_worker, charts, chunksize=chunksize))
+
+    def shutdown(self) -> None:
+        """Stop the render processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_render_pools = {}
+_render_pools_lock = threading.Lock()
+
+
+def get_chart_render_pool(workers: int, style: str = "whitegrid") -> ChartRenderPool:
+    """
+    Get or create the process-wide render pool for a worker count and style.
+
+    Args:
+        workers: Number of render processes
+        style: Seaborn style used by the workers
+
+    Returns:
+        A warm ChartRenderPool
+    """
+    with _render_pools_lock:
+        pool = _render_pools.get((workers, style))
+        if pool is None:
+            pool = ChartRenderPool(workers, style)
+            _render_pools[(workers, style)] = pool
+        return pool
+
+
+def render_charts_parallel(
+    charts: List[Union[ChartData, Dict[str, Any]]],
+    workers: int,
+    style: str = "whitegrid",
+) -> List[bytes]:
+    """
+    Render charts on the shared render pool.
+
+    A pool whose processes died is discarded, so the next call starts a fresh one.
+
+    Args:
+        charts: Chart data for each chart
+        workers: Number of render processes
+        style: Seaborn style used by the workers
+
+    Returns:
+        PNG image bytes, in the same order as the input
+
+    Raises:
+        VisualizationError: If rendering fails
+    """
+    pool = get_chart_render_pool(workers, style)
+    try:
+        return pool.render(charts)
+    except BrokenProcessPool as e:
+        with _render_pools_lock:
+            if _render_pools.get((workers, style)) is pool:
+                del _render_pools[(workers, style)]
+        raise VisualizationError(f"Chart render pool failed: {str(e)}")
+    except Exception as e:
+        raise VisualizationError(f"Failed to render charts: {str(e)}")
@@ -71,10 +71,30 @@ const CreateSurvey = () => {
           addBotMessage('Starting to generate the survey...');
           break;
           
+        case 'queued':
+          addBotMessage(data.message);
+          break;
+          
         case 'generation_chunk':
           setGeneratedContent(prev => prev + data.content);
           break;
           
+        case 'title_ready':
+          setSurveyPreview({
+            title: data.title,
+            description: data.description,
+            questions: [],
+          });
+          break;
+          
+        case 'question_ready':
+          setSurveyPreview(prev => {
+            const questions = [...(prev?.questions || [])];
+            questions[data.index] = data.question;
+            return { title: '', description: '', ...prev, questions };
+          });
+          break;
+          
         case 'generation_complete':
           setIsGenerating(false);
           setIsSurveyDone(true);
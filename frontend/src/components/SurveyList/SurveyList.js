@@ -6,6 +6,8 @@ import './SurveyList.css';
 
 const SurveyList = () => {
   const [surveys, setSurveys] = useState([]);
+  const [nextPageUrl, setNextPageUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [deleteMessage, setDeleteMessage] = useState(null);
@@ -30,7 +32,8 @@ const SurveyList = () => {
         }
         
         const data = await response.json();
-        setSurveys(data);
+        setSurveys(data.results);
+        setNextPageUrl(data.next);
         setLoading(false);
       } catch (error) {
         console.error('Error fetching surveys:', error);
@@ -42,6 +45,27 @@ const SurveyList = () => {
     fetchSurveys();
   }, []);
 
+  // Load next page of surveys
+  const handleLoadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await fetch(nextPageUrl);
+      
+      if (!response.ok) {
+        throw new Error(`HTTP error! Status: ${response.status}`);
+      }
+      
+      const data = await response.json();
+      setSurveys(prevSurveys => [...prevSurveys, ...data.results]);
+      setNextPageUrl(data.next);
+    } catch (error) {
+      console.error('Error fetching surveys:', error);
+      setError('Failed to load surveys. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Delete survey
   const handleDelete = async (publicId, title) => {
     if (window.confirm(`Are you sure you want to delete the survey "${title}"?`)) {
@@ -131,6 +155,18 @@ const SurveyList = () => {
           ))}
         </div>
       )}
+      
+      {nextPageUrl && (
+        <div className="load-more">
+          <button
+            className="btn secondary"
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
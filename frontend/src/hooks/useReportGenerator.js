@@ -1,5 +1,7 @@
 import { useState } from 'react';
 
+const POLL_INTERVAL_MS = 1000;
+
 const useReportGenerator = () => {
   const [isGeneratingReport, setIsGeneratingReport] = useState(false);
   const [reportError, setReportError] = useState(null);
@@ -9,7 +11,34 @@ const useReportGenerator = () => {
       setIsGeneratingReport(true);
       setReportError(null);
       
-      const response = await fetch(`http://localhost:8000/api/surveys/${publicId}/report/`, {
+      const jobResponse = await fetch(`http://localhost:8000/api/surveys/${publicId}/report/jobs/`, {
+        method: 'POST',
+        headers: {
+          'Accept': 'application/json'
+        }
+      });
+      
+      if (!jobResponse.ok) {
+        throw new Error(`HTTP error! Status: ${jobResponse.status}`);
+      }
+
+      let job = await jobResponse.json();
+
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+
+        const statusResponse = await fetch(job.status_url);
+        if (!statusResponse.ok) {
+          throw new Error(`HTTP error! Status: ${statusResponse.status}`);
+        }
+        job = await statusResponse.json();
+      }
+
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Report generation failed');
+      }
+
+      const response = await fetch(job.download_url, {
         method: 'GET',
         headers: {
           'Accept': 'application/pdf'